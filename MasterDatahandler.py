@@ -1,4 +1,7 @@
 from Datahandler import Datahandler
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
+import numpy as np
 import pandas as pd
 
 class MasterDatahandler:
@@ -10,15 +13,32 @@ class MasterDatahandler:
         self.master_df = pd.DataFrame()
 
     def load_all_data(self, source='yahoo'):
-        for symbol, handler in self.handlers.items():
-            handler.load_data(source=source)
+        if source == 'yahoo' and len(self.handlers) > 1:
+            # One bulk request for every symbol instead of one round-trip each
+            frames = Datahandler.download_many(self.asset_symbols, self.start_date, self.end_date)
+            for symbol, handler in self.handlers.items():
+                handler.data = frames[symbol]
+            self.create_master_dataframe()
+            return
+
+        # Other sources are loaded per handler; overlap them in a thread pool so
+        # wall-clock time follows the slowest symbol instead of the sum of all of them.
+        max_workers = max(1, min(16, len(self.handlers)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(lambda handler: handler.load_data(source=source), self.handlers.values()))
         self.create_master_dataframe()
 
     def create_master_dataframe(self):
-        dfs = []
-        for symbol, handler in self.handlers.items():
-            df = handler.get_all_data()[['Close']].rename(columns={'Close': f'{symbol}_Close'})
-            dfs.append(df)
-        self.master_df = pd.concat(dfs, axis=1)
+        # Align every Close series on the union of all timestamps and fill a single
+        # preallocated array, instead of concatenating one renamed frame per symbol.
+        symbols = list(self.handlers)
+        closes = [self.handlers[symbol].get_all_data()['Close'] for symbol in symbols]
+        master_index = reduce(lambda left, right: left.union(right), (close.index for close in closes))
+
+        arr = np.empty((len(master_index), len(symbols)), dtype=np.float64)
+        for i, close in enumerate(closes):
+            arr[:, i] = close.reindex(master_index).to_numpy(dtype=np.float64)
+
+        self.master_df = pd.DataFrame(arr, index=master_index, columns=[f'{symbol}_Close' for symbol in symbols])
         print("\n-- PRICE ASSETS DATABASE --\n")
         print(self.master_df.head(), "\n")
\ No newline at end of file
@@ -0,0 +1,231 @@
+# backtest/_kernel.py
+"""
+Kernel compilado con Numba para el backtest de un solo instrumento.
+
+Reproduce la lógica de BacktestEngine.run + Portfolio.update_market +
+Trade.check_exit como una máquina de estados escalar sobre arrays NumPy:
+- Como mucho hay una posición abierta (plana, larga o corta).
+- SL/TP se comprueban primero; después se procesa la señal de la barra.
+- SL/TP desactivados se representan con NaN (las comparaciones con NaN son
+  siempre falsas, así que nunca disparan).
+
+La curva de equity no se escribe barra a barra: equity_from_trades() la
+reconstruye después con unas pocas operaciones NumPy a partir de los trades.
+
+grid_sim() simula en paralelo (prange) una matriz de señales, una fila por
+combinación de parámetros, sobre los mismos precios.
+
+Si numba no está instalado, `njit` es un decorador identidad y el kernel se
+ejecuta como Python puro (mismos resultados, sin la aceleración).
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - depende del entorno
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
+
+
+@njit(cache=True)
+def run_single(prices, signals, cash, cash_per_trade, sl_pct, tp_pct):
+    """
+    Simula el backtest completo de un instrumento.
+
+    Args:
+        prices: float64[n] precios de cierre.
+        signals: int8[n] señales (1 = long, -1 = short, 0 = neutral).
+        cash: Caja inicial.
+        cash_per_trade: Máximo nominal por trade.
+        sl_pct: Stop-loss relativo al precio de entrada (NaN para desactivar).
+        tp_pct: Take-profit relativo al precio de entrada (NaN para desactivar).
+
+    Returns:
+        (entry_idx, exit_idx, entry_px, exit_px, directions, sizes, pnls, cash).
+        Un trade con exit_idx == -1 sigue abierto al final.
+    """
+    n = prices.shape[0]
+
+    # Como mucho se abre un trade por barra
+    entry_idx = np.empty(n, dtype=np.int64)
+    exit_idx = np.empty(n, dtype=np.int64)
+    entry_px = np.empty(n, dtype=np.float64)
+    exit_px = np.empty(n, dtype=np.float64)
+    directions = np.empty(n, dtype=np.int8)
+    sizes = np.empty(n, dtype=np.float64)
+    pnls = np.empty(n, dtype=np.float64)
+    n_trades = 0
+
+    # Multiplicadores SL/TP fijos (NaN si están desactivados)
+    sl_long_mult = 1.0 - sl_pct
+    sl_short_mult = 1.0 + sl_pct
+    tp_long_mult = 1.0 + tp_pct
+    tp_short_mult = 1.0 - tp_pct
+
+    pos_dir = 0  # 0 plano, +1 largo, -1 corto
+    entry_price = 0.0
+    size = 0.0
+    sl = np.nan
+    tp = np.nan
+
+    for i in range(n):
+        price = prices[i]
+
+        # 1) SL/TP sobre la posición abierta
+        if pos_dir != 0:
+            hit = ((pos_dir == 1) & ((price <= sl) | (price >= tp))) | (
+                (pos_dir == -1) & ((price >= sl) | (price <= tp))
+            )
+            if hit:
+                pnl = pos_dir * (price - entry_price) * size
+                cash += entry_price * size + pnl
+                k = n_trades - 1
+                exit_idx[k] = i
+                exit_px[k] = price
+                pnls[k] = pnl
+                pos_dir = 0
+
+        # 2) Señal: cerrar opuesto y abrir nueva si procede
+        signal = signals[i]
+        if signal != 0:
+            if pos_dir == -signal:
+                pnl = pos_dir * (price - entry_price) * size
+                cash += entry_price * size + pnl
+                k = n_trades - 1
+                exit_idx[k] = i
+                exit_px[k] = price
+                pnls[k] = pnl
+                pos_dir = 0
+
+            if pos_dir == 0:
+                alloc_cash = min(cash_per_trade, cash)
+                if alloc_cash > 0:
+                    new_size = alloc_cash / price
+                    cost = price * new_size
+                    if cost > cash and price > 0:
+                        new_size = cash / price
+                        cost = price * new_size
+                    if cost > 0:
+                        pos_dir = 1 if signal == 1 else -1
+                        entry_price = price
+                        size = new_size
+                        if pos_dir == 1:
+                            sl = price * sl_long_mult
+                            tp = price * tp_long_mult
+                        else:
+                            sl = price * sl_short_mult
+                            tp = price * tp_short_mult
+                        cash -= cost
+
+                        k = n_trades
+                        entry_idx[k] = i
+                        exit_idx[k] = -1
+                        entry_px[k] = price
+                        exit_px[k] = np.nan
+                        directions[k] = pos_dir
+                        sizes[k] = size
+                        pnls[k] = np.nan
+                        n_trades += 1
+
+    return (
+        entry_idx[:n_trades],
+        exit_idx[:n_trades],
+        entry_px[:n_trades],
+        exit_px[:n_trades],
+        directions[:n_trades],
+        sizes[:n_trades],
+        pnls[:n_trades],
+        cash,
+    )
+
+
+def equity_from_trades(prices, cash, entry_idx, exit_idx, entry_px, directions, sizes, pnls):
+    """
+    Curva de equity a partir de los trades de run_single, sin bucle por barra.
+
+    equity[i] = caja tras los eventos de la barra i + PnL no realizado del
+    trade abierto al cierre de la barra i (como mucho uno a la vez).
+
+    Args:
+        prices: float64[n] precios de cierre.
+        cash: Caja inicial.
+        Resto: arrays devueltos por run_single.
+
+    Returns:
+        float64[n] equity por barra.
+    """
+    n = prices.shape[0]
+    if len(entry_idx) == 0:
+        return np.full(n, cash, dtype=np.float64)
+
+    closed = exit_idx >= 0
+    cost = entry_px * sizes
+
+    # Caja: -coste al abrir, +coste+PnL al cerrar, acumulado
+    cash_delta = np.zeros(n, dtype=np.float64)
+    np.add.at(cash_delta, entry_idx, -cost)
+    np.add.at(cash_delta, exit_idx[closed], cost[closed] + pnls[closed])
+    cash_curve = cash + np.cumsum(cash_delta)
+
+    # Intervalos abiertos [entry, exit) y trade vigente en cada barra
+    open_delta = np.zeros(n, dtype=np.int64)
+    np.add.at(open_delta, entry_idx, 1)
+    np.add.at(open_delta, exit_idx[closed], -1)
+    is_open = np.cumsum(open_delta) > 0
+
+    starts = np.zeros(n, dtype=np.int64)
+    starts[entry_idx] = 1
+    k = np.maximum(np.cumsum(starts) - 1, 0)
+
+    unrealized = directions[k] * (prices - entry_px[k]) * sizes[k]
+    return cash_curve + np.where(is_open, unrealized, 0.0)
+
+
+@njit(parallel=True, cache=True)
+def grid_sim(signals_mat, prices, cash, cash_per_trade, sl_pct, tp_pct):
+    """
+    run_single para cada fila de signals_mat, en paralelo (las filas son
+    independientes y solo leen prices).
+
+    Args:
+        signals_mat: int8[k, n] señales, una fila por combinación.
+        Resto: como run_single.
+
+    Returns:
+        (entry_idx, exit_idx, entry_px, directions, sizes, pnls, n_trades): los
+        arrays de run_single de cada fila en matrices [k, n] (la fila k es válida
+        hasta n_trades[k]; como mucho un trade por barra) e int64[k] trades.
+        La equity de cada fila se obtiene con equity_from_trades.
+    """
+    k_rows, n = signals_mat.shape
+    entry_idx = np.empty((k_rows, n), dtype=np.int64)
+    exit_idx = np.empty((k_rows, n), dtype=np.int64)
+    entry_px = np.empty((k_rows, n), dtype=np.float64)
+    directions = np.empty((k_rows, n), dtype=np.int8)
+    sizes = np.empty((k_rows, n), dtype=np.float64)
+    pnls = np.empty((k_rows, n), dtype=np.float64)
+    n_trades = np.empty(k_rows, dtype=np.int64)
+    for k in prange(k_rows):
+        e_idx, x_idx, e_px, _, dirs, szs, pnl, _ = run_single(
+            prices, signals_mat[k], cash, cash_per_trade, sl_pct, tp_pct
+        )
+        m = e_idx.shape[0]
+        n_trades[k] = m
+        entry_idx[k, :m] = e_idx
+        exit_idx[k, :m] = x_idx
+        entry_px[k, :m] = e_px
+        directions[k, :m] = dirs
+        sizes[k, :m] = szs
+        pnls[k, :m] = pnl
+    return entry_idx, exit_idx, entry_px, directions, sizes, pnls, n_trades
@@ -7,15 +7,46 @@ Correcciones clave:
 - Cierre de posición opuesta cuando aparece señal contraria.
 - stop_loss y take_profit como PORCENTAJES relativos al precio de entrada.
 - cash_per_trade: limita el nominal por operación (p.ej., 500 USD).
+- Ruta rápida de un solo instrumento compilada con Numba (backtest/_kernel.py).
 """
 
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
+import numpy as np
 import pandas as pd
 import datetime as dt
 
 from core.portfolio import Portfolio
+from core.trade import Trade
 from strategies.base import Strategy
 from core.metrics import summarize_performance
+from backtest._kernel import equity_from_trades, run_single
+
+
+def _sl_tp_multipliers(
+    stop_loss: Optional[float], take_profit: Optional[float]
+) -> Tuple[bool, bool, float, float, float, float]:
+    """
+    Resuelve SL/TP porcentuales en multiplicadores fijos sobre el precio de entrada.
+
+    Returns:
+        (sl_enabled, tp_enabled, sl_long_mult, sl_short_mult, tp_long_mult, tp_short_mult)
+    """
+    sl_enabled = stop_loss is not None
+    tp_enabled = take_profit is not None
+    sl_long_mult = (1.0 - stop_loss) if sl_enabled else 0.0
+    sl_short_mult = (1.0 + stop_loss) if sl_enabled else 0.0
+    tp_long_mult = (1.0 + take_profit) if tp_enabled else 0.0
+    tp_short_mult = (1.0 - take_profit) if tp_enabled else 0.0
+    return sl_enabled, tp_enabled, sl_long_mult, sl_short_mult, tp_long_mult, tp_short_mult
+
+
+def _close_and_index(data) -> Tuple[np.ndarray, pd.Index]:
+    """Precios de cierre (float64) e índice temporal de un DataFrame de pandas o de Polars."""
+    if isinstance(data, pd.DataFrame):
+        return data["close"].to_numpy(dtype=np.float64), data.index
+    # polars.DataFrame: puente vía NumPy sin convertir el frame completo
+    close = data["close"].to_numpy().astype(np.float64, copy=False)
+    return close, pd.DatetimeIndex(data["timestamp"].to_pandas())
 
 
 class BacktestEngine:
@@ -30,52 +61,158 @@ class BacktestEngine:
         cash_per_trade: float = 500.0,
         stop_loss: Optional[float] = 0.02,     # porcentaje (2% = 0.02)
         take_profit: Optional[float] = 0.04,   # porcentaje (4% = 0.04)
+        use_kernel: bool = True,
     ):
         """
         Args:
-            data: DataFrame con columna 'close' e índice datetime (UTC).
+            data: DataFrame con columna 'close' e índice datetime (UTC), o un
+                polars.DataFrame con columnas 'timestamp' y 'close' (DataLoader.get_polars).
             cash_per_trade: Máximo nominal por trade en moneda.
             stop_loss: Porcentaje de SL respecto al precio de entrada (None para desactivar).
             take_profit: Porcentaje de TP respecto al precio de entrada (None para desactivar).
+            use_kernel: Usar el kernel compilado de un solo instrumento (backtest/_kernel.py).
+                Solo se aplica si el portfolio no tiene trades abiertos; si no, se usa el
+                bucle por eventos sobre Portfolio/Trade.
         """
-        # Generar señales
-        signals = self.strategy.generate_signals(data)
+        # Generar señales: ruta NumPy de la estrategia si la ofrece (sin ida y
+        # vuelta por pd.Series), si no la ruta pandas.
+        # Arrays NumPy extraídos una sola vez: el bucle indexa por posición
+        # en lugar de hacer data.loc[timestamp, "close"] en cada barra.
+        prices, ts = _close_and_index(data)
+        sigs = self.strategy.generate_signals_numpy(prices)
+        if sigs is None:
+            if not isinstance(data, pd.DataFrame):
+                data = data.to_pandas().set_index("timestamp")
+            signals = self.strategy.generate_signals(data)
+            prices = data["close"].reindex(signals.index).to_numpy(dtype=np.float64)
+            sigs = signals.to_numpy()
+            ts = signals.index
+
+        if use_kernel and not self.portfolio.trades_open:
+            equity_history = self._run_kernel(prices, sigs, ts, cash_per_trade, stop_loss, take_profit)
+        else:
+            equity_history = self._run_loop(prices, sigs, ts, cash_per_trade, stop_loss, take_profit)
+
+        self.equity_curve = pd.Series(equity_history, index=ts, copy=False)
+
+    def _run_kernel(
+        self,
+        prices: np.ndarray,
+        sigs: np.ndarray,
+        ts: pd.Index,
+        cash_per_trade: float,
+        stop_loss: Optional[float],
+        take_profit: Optional[float],
+    ) -> np.ndarray:
+        """Ruta rápida: simula con el kernel y reconstruye los Trade al final."""
+        instrument = self.strategy.instrument
+
+        initial_cash = float(self.portfolio.cash)
+        (
+            entry_idx,
+            exit_idx,
+            entry_px,
+            exit_px,
+            directions,
+            sizes,
+            pnls,
+            cash,
+        ) = run_single(
+            prices,
+            np.asarray(sigs, dtype=np.int8),
+            initial_cash,
+            float(cash_per_trade),
+            stop_loss if stop_loss is not None else np.nan,
+            take_profit if take_profit is not None else np.nan,
+        )
 
-        # Historia de equity
-        equity_history = []
+        # Reconstruir los Trade en una sola pasada para los reportes
+        sl_enabled, tp_enabled, sl_long_mult, sl_short_mult, tp_long_mult, tp_short_mult = (
+            _sl_tp_multipliers(stop_loss, take_profit)
+        )
+        for k in range(len(entry_idx)):
+            price = float(entry_px[k])
+            if directions[k] == 1:
+                direction = "long"
+                sl = price * sl_long_mult if sl_enabled else None
+                tp = price * tp_long_mult if tp_enabled else None
+            else:
+                direction = "short"
+                sl = price * sl_short_mult if sl_enabled else None
+                tp = price * tp_short_mult if tp_enabled else None
+
+            trade = Trade(
+                ticker=instrument,
+                direction=direction,
+                entry_price=price,
+                size=float(sizes[k]),
+                stop_loss=sl,
+                take_profit=tp,
+                entry_time=ts[entry_idx[k]],
+            )
+            if exit_idx[k] >= 0:
+                trade.exit_price = float(exit_px[k])
+                trade.exit_time = ts[exit_idx[k]]
+                trade.status = "closed"
+                trade.pnl = float(pnls[k])
+                self.portfolio.trades_closed.append(trade)
+            else:
+                self.portfolio.register_open_trade(trade)
+
+        self.portfolio.cash = float(cash)
+
+        # Curva de equity en una sola pasada vectorizada
+        return equity_from_trades(
+            prices, initial_cash, entry_idx, exit_idx, entry_px, directions, sizes, pnls
+        )
+
+    def _run_loop(
+        self,
+        prices: np.ndarray,
+        sigs: np.ndarray,
+        ts: pd.Index,
+        cash_per_trade: float,
+        stop_loss: Optional[float],
+        take_profit: Optional[float],
+    ) -> np.ndarray:
+        """Ruta general: bucle por eventos sobre Portfolio/Trade."""
+        instrument = self.strategy.instrument
+
+        # Historia de equity (preasignada)
+        equity_history = np.empty(len(sigs), dtype=np.float64)
+
+        # Multiplicadores SL/TP fijos para toda la ejecución
+        sl_enabled, tp_enabled, sl_long_mult, sl_short_mult, tp_long_mult, tp_short_mult = (
+            _sl_tp_multipliers(stop_loss, take_profit)
+        )
 
-        for timestamp, signal in signals.items():
-            price = float(data.loc[timestamp, "close"])
+        for i in range(len(sigs)):
+            price = float(prices[i])
+            signal = sigs[i]
+            timestamp = ts[i]
 
             # 1) Actualizar SL/TP en posiciones abiertas
-            self.portfolio.update_market(self.strategy.instrument, price, timestamp)
+            self.portfolio.update_market(instrument, price, timestamp)
 
             # Estado actual por instrumento
-            directions = {
-                t.direction
-                for t in self.portfolio.trades_open.values()
-                if t.ticker == self.strategy.instrument
-            }
-            has_long = "long" in directions
-            has_short = "short" in directions
+            has_long = self.portfolio.has_long(instrument)
+            has_short = self.portfolio.has_short(instrument)
 
             # 2) Gestión de señales: cerrar opuesto y abrir nueva si procede
             if signal == 1:
                 # Cerrar cortos abiertos
                 if has_short:
-                    for t_id, t in list(self.portfolio.trades_open.items()):
-                        if t.ticker == self.strategy.instrument and t.direction == "short":
-                            self.portfolio.close_trade(t_id, price, timestamp)
+                    self.portfolio.close_trades(instrument, "short", price, timestamp)
                 # Abrir largo si no existe
                 if not has_long:
                     # Calcular tamaño desde cash_per_trade y caja disponible
                     alloc_cash = min(cash_per_trade, self.portfolio.cash)
                     if alloc_cash > 0:
                         size = alloc_cash / price
-                        sl = price * (1 - stop_loss) if stop_loss is not None else None
-                        tp = price * (1 + take_profit) if take_profit is not None else None
+                        sl = price * sl_long_mult if sl_enabled else None
+                        tp = price * tp_long_mult if tp_enabled else None
                         self.portfolio.open_trade(
-                            symbol=self.strategy.instrument,
+                            symbol=instrument,
                             direction="long",
                             entry_price=price,
                             size=size,
@@ -87,18 +224,16 @@ class BacktestEngine:
             elif signal == -1:
                 # Cerrar largos abiertos
                 if has_long:
-                    for t_id, t in list(self.portfolio.trades_open.items()):
-                        if t.ticker == self.strategy.instrument and t.direction == "long":
-                            self.portfolio.close_trade(t_id, price, timestamp)
+                    self.portfolio.close_trades(instrument, "long", price, timestamp)
                 # Abrir corto si no existe
                 if not has_short:
                     alloc_cash = min(cash_per_trade, self.portfolio.cash)
                     if alloc_cash > 0:
                         size = alloc_cash / price
-                        sl = price * (1 + stop_loss) if stop_loss is not None else None
-                        tp = price * (1 - take_profit) if take_profit is not None else None
+                        sl = price * sl_short_mult if sl_enabled else None
+                        tp = price * tp_short_mult if tp_enabled else None
                         self.portfolio.open_trade(
-                            symbol=self.strategy.instrument,
+                            symbol=instrument,
                             direction="short",
                             entry_price=price,
                             size=size,
@@ -108,10 +243,9 @@ class BacktestEngine:
                         )
 
             # 3) Registrar equity
-            current_prices = {self.strategy.instrument: price}
-            equity_history.append(self.portfolio.equity(current_prices))
+            equity_history[i] = self.portfolio.equity_single(price, instrument)
 
-        self.equity_curve = pd.Series(equity_history, index=signals.index)
+        return equity_history
 
     def get_performance(self, risk_free_rate: float = 0.0, periods_per_year: int = 252) -> Dict[str, float]:
         return summarize_performance(
@@ -0,0 +1,212 @@
+# backtest/optimize.py
+"""
+Barrido de parámetros del cruce SMA (settings.SMA_SHORT_GRID x SMA_LONG_GRID).
+
+- Cada media móvil distinta se calcula una sola vez y se reutiliza en todas las
+  combinaciones que la usan (p.ej. 9 medias para 20 combinaciones).
+- Las señales de todas las combinaciones forman una matriz (K, N) int8 y las
+  filas se simulan en paralelo con el kernel compilado (grid_sim, prange).
+- Mismas señales y resultados que BacktestEngine con SMACrossoverStrategy.
+- run_single_backtest() memoiza en disco (REPORTS_DIR/bt_cache) cada backtest
+  completo, con clave = parámetros + hash de los datos + CACHE_VERSION (hash
+  del código del motor, el kernel y la estrategia), así que un cambio en ese
+  código invalida la caché sin tener que borrarla a mano.
+"""
+
+from functools import lru_cache, wraps
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+import hashlib
+import inspect
+import pickle
+import numpy as np
+import pandas as pd
+
+from config import settings
+from backtest import _kernel, engine as _engine
+from core import metrics as _metrics, portfolio as _portfolio, trade as _trade
+from strategies import base as _strategy_base, sma_crossover as _sma_crossover
+from backtest._kernel import equity_from_trades, grid_sim
+from backtest.engine import BacktestEngine
+from datafeed.loader import DataLoader
+from strategies.sma_crossover import SMACrossoverStrategy, crossover_from_sma, rolling_mean
+
+
+def sma_grid_signals(
+    close: np.ndarray,
+    short_grid: Optional[Sequence[int]] = None,
+    long_grid: Optional[Sequence[int]] = None,
+) -> Tuple[List[Tuple[int, int]], np.ndarray]:
+    """
+    Señales de cruce SMA de todas las combinaciones short < long.
+
+    Args:
+        close: float64[n] precios de cierre.
+        short_grid: Ventanas cortas (por defecto settings.SMA_SHORT_GRID).
+        long_grid: Ventanas largas (por defecto settings.SMA_LONG_GRID).
+
+    Returns:
+        (combos, signals): lista de (short, long) y matriz int8 (len(combos), n).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    short_grid = settings.SMA_SHORT_GRID if short_grid is None else short_grid
+    long_grid = settings.SMA_LONG_GRID if long_grid is None else long_grid
+    combos = [(s, l) for s in short_grid for l in long_grid if s < l]
+
+    # Una media por ventana distinta, compartida entre combinaciones
+    windows = sorted({w for combo in combos for w in combo})
+    sma = {w: rolling_mean(close, w) for w in windows}
+
+    signals = np.empty((len(combos), close.shape[0]), dtype=np.int8)
+    for k, (s, l) in enumerate(combos):
+        signals[k] = crossover_from_sma(sma[s], sma[l])
+    return combos, signals
+
+
+def run_sma_grid(
+    close: np.ndarray,
+    short_grid: Optional[Sequence[int]] = None,
+    long_grid: Optional[Sequence[int]] = None,
+    initial_capital: float = settings.INITIAL_CAPITAL,
+    cash_per_trade: float = 500.0,
+    stop_loss: Optional[float] = settings.RISK.stop_loss_pct,
+    take_profit: Optional[float] = settings.RISK.take_profit_pct,
+) -> pd.DataFrame:
+    """
+    Simula todas las combinaciones del grid sobre la misma serie de precios.
+
+    Returns:
+        DataFrame indexado por (short_window, long_window) con final_equity,
+        total_return, max_drawdown y trades (trades cerrados, como
+        len(BacktestEngine.portfolio.trades_closed); el abierto al final no cuenta).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    combos, signals = sma_grid_signals(close, short_grid, long_grid)
+    sl = stop_loss if stop_loss is not None else np.nan
+    tp = take_profit if take_profit is not None else np.nan
+
+    # Todas las combinaciones en paralelo; equity de cada fila con el mismo
+    # ledger que BacktestEngine (equity_from_trades)
+    entry_idx, exit_idx, entry_px, directions, sizes, pnls, n_trades = grid_sim(
+        signals, close, float(initial_capital), float(cash_per_trade), sl, tp
+    )
+    final_equity = np.full(len(combos), float(initial_capital))
+    max_drawdown = np.zeros(len(combos))
+    trades_closed = np.zeros(len(combos), dtype=np.int64)
+    for k, m in enumerate(n_trades):
+        trades_closed[k] = np.count_nonzero(exit_idx[k, :m] >= 0)
+        if close.shape[0]:
+            equity = equity_from_trades(
+                close, float(initial_capital), entry_idx[k, :m], exit_idx[k, :m],
+                entry_px[k, :m], directions[k, :m], sizes[k, :m], pnls[k, :m],
+            )
+            final_equity[k] = equity[-1]
+            max_drawdown[k] = (equity / np.maximum.accumulate(equity) - 1.0).min()
+
+    index = pd.MultiIndex.from_tuples(combos, names=["short_window", "long_window"])
+    return pd.DataFrame(
+        {
+            "final_equity": final_equity,
+            "total_return": final_equity / initial_capital - 1.0,
+            "max_drawdown": max_drawdown,
+            "trades": trades_closed,
+        },
+        index=index,
+    )
+
+
+def _source_hash(*modules) -> str:
+    """sha256 (16 hex) del código fuente de los módulos dados, en orden."""
+    h = hashlib.sha256()
+    for module in modules:
+        h.update(Path(module.__file__).read_bytes())
+    return h.hexdigest()[:16]
+
+
+# Versión del código que produce los resultados memoizados por run_single_backtest.
+# Cualquier cambio en estos ficheros genera claves nuevas (los .pkl viejos quedan
+# huérfanos; pueden borrarse con el directorio bt_cache).
+CACHE_VERSION = _source_hash(
+    _engine, _kernel, _portfolio, _trade, _metrics, _strategy_base, _sma_crossover
+)
+
+
+def disk_memoize(cache_dir: Path, key: Callable[..., str], version: str = ""):
+    """
+    Decorador: guarda en cache_dir el resultado (pickle) de cada llamada.
+
+    Args:
+        cache_dir: Directorio de la caché.
+        key: Recibe los argumentos de la llamada (por nombre, con los valores por
+            defecto aplicados) y devuelve la cadena que identifica el resultado;
+            el fichero se nombra con el sha256 de version + clave.
+        version: Versión del código de func (p.ej. CACHE_VERSION); al cambiar,
+            los resultados guardados dejan de usarse.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            digest = hashlib.sha256(f"{version}|{key(**bound.arguments)}".encode()).hexdigest()
+            path = Path(cache_dir) / f"{func.__name__}_{digest}.pkl"
+
+            if path.exists():
+                try:
+                    with open(path, "rb") as f:
+                        return pickle.load(f)
+                except Exception:
+                    # Fichero corrupto o de otra versión: recalcular
+                    path.unlink(missing_ok=True)
+
+            result = func(*args, **kwargs)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp.replace(path)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+@lru_cache(maxsize=1)
+def _default_loader() -> DataLoader:
+    return DataLoader()
+
+
+def _backtest_key(symbol, interval, period, short_window, long_window, cash_per_trade, stop_loss, take_profit) -> str:
+    data = _default_loader().get(symbol, interval, period)
+    data_hash = hashlib.sha256(pd.util.hash_pandas_object(data["close"]).to_numpy().tobytes()).hexdigest()
+    return f"{symbol}|{interval}|{period}|{short_window}|{long_window}|{cash_per_trade}|{stop_loss}|{take_profit}|{data_hash}"
+
+
+@disk_memoize(settings.REPORTS_DIR / "bt_cache", key=_backtest_key, version=CACHE_VERSION)
+def run_single_backtest(
+    symbol: str,
+    interval: str = settings.DEFAULT_INTERVAL,
+    period: str = settings.DEFAULT_PERIOD,
+    short_window: int = 10,
+    long_window: int = 50,
+    cash_per_trade: float = 500.0,
+    stop_loss: Optional[float] = settings.RISK.stop_loss_pct,
+    take_profit: Optional[float] = settings.RISK.take_profit_pct,
+):
+    """
+    Backtest completo de SMACrossoverStrategy sobre los datos de DataLoader.
+
+    Returns:
+        (trades, equity_curve): trades cerrados y curva de equity.
+    """
+    data = _default_loader().get(symbol, interval, period)
+    engine = BacktestEngine(
+        strategy=SMACrossoverStrategy(symbol, short_window=short_window, long_window=long_window),
+        initial_capital=settings.INITIAL_CAPITAL,
+    )
+    engine.run(data, cash_per_trade=cash_per_trade, stop_loss=stop_loss, take_profit=take_profit)
+    return engine.portfolio.trades_closed, engine.equity_curve
@@ -16,8 +16,10 @@ Everything here is intentionally explicit and documented, so other modules
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import cache
 from pathlib import Path
-from typing import Dict, Tuple, Optional
+from types import MappingProxyType
+from typing import Dict, Mapping, Tuple, Optional
 import zoneinfo
 
 
@@ -83,7 +85,9 @@ MARKET_PROFILES: Dict[str, dict] = {
 # 1) XRP-USD (crypto), 2) SPY (ETF), 3) TSLA (stock), 4) EURUSD=X (FX, recommended for diversification)
 # All are widely followed, highly liquid, and have intraday data on Yahoo Finance.
 
-INSTRUMENTS: Dict[str, dict] = {
+# Read-only view: the universe is static, so lookups derived from it
+# (e.g. core.instruments.get_instruments) can be cached safely.
+INSTRUMENTS: Mapping[str, dict] = MappingProxyType({
     "XRP-USD": {
         "symbol": "XRP-USD",
         "asset_class": "CRYPTO",
@@ -108,7 +112,7 @@ INSTRUMENTS: Dict[str, dict] = {
         "market_profile": "FX_24_5",
         "currency": "USD",
     },
-}
+})
 
 DEFAULT_UNIVERSE = list(INSTRUMENTS.keys())
 
@@ -198,21 +202,25 @@ NP_RANDOM_SEED: int = 42
 # Helper Functions
 # =============================================================================
 
+@cache
 def yf_max_period_for_interval(interval: str) -> str:
     """
     Return a safe Yahoo Finance max period for a given intraday interval.
     Falls back to DEFAULT_PERIOD if the interval is unknown.
+    Cached: YF_INTERVAL_LIMITS is a module-level constant.
     """
     return YF_INTERVAL_LIMITS.get(interval, DEFAULT_PERIOD)
 
-def get_universe() -> Dict[str, dict]:
-    """Return the instrument dictionary (mutable copy not needed for read-only use)."""
+def get_universe() -> Mapping[str, dict]:
+    """Return the (read-only) instrument mapping."""
     return INSTRUMENTS
 
+@cache
 def market_profile_for(symbol: str) -> dict:
     """
     Return the market profile dict for a given symbol based on INSTRUMENTS mapping.
     Raises KeyError if symbol does not exist or profile missing.
+    Cached per symbol: INSTRUMENTS is read-only (KeyErrors are not cached).
     """
     meta = INSTRUMENTS[symbol]
     profile_name = meta["market_profile"]
@@ -236,20 +244,32 @@ def default_download_params() -> Tuple[str, str]:
     return DEFAULT_INTERVAL, yf_max_period_for_interval(DEFAULT_INTERVAL)
 
 
+# Filename-safe symbol translation table ('=' and '/' -> '-'), single C-level pass.
+_SYMBOL_TRANS = str.maketrans({"=": "-", "/": "-"})
+
+
 def path_for_raw_csv(symbol: str, interval: str) -> Path:
     """
     Build a deterministic filename for raw downloads, e.g.:
     data/raw/SPY_5m.csv
     """
-    safe_symbol = symbol.replace("=", "-").replace("/", "-")
+    safe_symbol = symbol.translate(_SYMBOL_TRANS)
     return RAW_DATA_DIR / f"{safe_symbol}_{interval}.csv"
 
 
+def path_for_raw_parquet(symbol: str, interval: str) -> Path:
+    """
+    Parquet counterpart of path_for_raw_csv (typed, compressed cache), e.g.:
+    data/raw/SPY_5m.parquet
+    """
+    return path_for_raw_csv(symbol, interval).with_suffix(".parquet")
+
+
 def path_for_processed_csv(symbol: str, interval: str) -> Path:
     """
     Build a deterministic filename for processed datasets, e.g.:
     data/processed/SPY_5m.parquet OR csv
     Here we keep CSV for simplicity and interoperability.
     """
-    safe_symbol = symbol.replace("=", "-").replace("/", "-")
+    safe_symbol = symbol.translate(_SYMBOL_TRANS)
     return PROCESSED_DATA_DIR / f"{safe_symbol}_{interval}.csv"
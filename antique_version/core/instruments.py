@@ -5,11 +5,14 @@ Instrument model.
 Correcciones:
 - Mapear 'asset_class' desde settings a 'type' si 'type' no existe.
 - Eliminar prints en get_instruments().
+- get_instruments() memoizado: se construye una vez y se devuelve como vista de solo lectura.
 """
 
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, Any
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, Mapping
 
 from config import settings
 
@@ -33,8 +36,9 @@ class Instrument:
         )
 
 
-def get_instruments() -> Dict[str, Instrument]:
+@lru_cache(maxsize=1)
+def get_instruments() -> Mapping[str, Instrument]:
     instruments: Dict[str, Instrument] = {}
     for symbol, meta in settings.INSTRUMENTS.items():
         instruments[symbol] = Instrument.from_dict(symbol, meta)
-    return instruments
+    return MappingProxyType(instruments)
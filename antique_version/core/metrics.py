@@ -6,12 +6,42 @@ Responsibilities:
 - Compute maximum drawdown.
 - Compute CAGR (Compound Annual Growth Rate).
 - Provide utility functions to summarize portfolio performance.
+
+All metrics run on the underlying NumPy arrays (no per-call pandas overhead),
+which matters when they are evaluated many times, e.g. in optimization loops.
 """
 
 import numpy as np
 import pandas as pd
 
 
+def _returns_array(equity: np.ndarray) -> np.ndarray:
+    """Simple returns of an equity array, NaN steps dropped (as pct_change().dropna())."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = equity[1:] / equity[:-1] - 1.0
+    return returns[~np.isnan(returns)]
+
+
+def _sharpe_from_array(returns: np.ndarray, risk_free_rate: float, periods_per_year: int) -> float:
+    returns = returns[~np.isnan(returns)]
+    if returns.size < 2:
+        # Sample std (ddof=1) undefined, like pandas
+        return float("nan")
+    excess_returns = returns - (risk_free_rate / periods_per_year)
+    std = excess_returns.std(ddof=1)
+    if std == 0:
+        return 0.0
+    return float(excess_returns.mean() / std * np.sqrt(periods_per_year))
+
+
+def _max_drawdown_from_array(equity: np.ndarray) -> float:
+    if equity.size == 0 or np.isnan(equity).all():
+        return float("nan")
+    # fmax ignores NaN, like cummax()
+    drawdown = equity / np.fmax.accumulate(equity) - 1.0
+    return float(np.nanmin(drawdown))
+
+
 def compute_returns(equity_curve: pd.Series) -> pd.Series:
     """
     Compute percentage returns from equity curve.
@@ -22,8 +52,11 @@ def compute_returns(equity_curve: pd.Series) -> pd.Series:
     Returns:
         pd.Series of returns.
     """
-    returns = equity_curve.pct_change().dropna()
-    return returns
+    equity = equity_curve.to_numpy(dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = equity[1:] / equity[:-1] - 1.0
+    keep = ~np.isnan(returns)
+    return pd.Series(returns[keep], index=equity_curve.index[1:][keep], name=equity_curve.name)
 
 
 def sharpe_ratio(returns: pd.Series, risk_free_rate: float = 0.0, periods_per_year: int = 252) -> float:
@@ -31,22 +64,14 @@ def sharpe_ratio(returns: pd.Series, risk_free_rate: float = 0.0, periods_per_ye
     Calculate annualized Sharpe ratio.
 
     Args:
-        returns: pd.Series of periodic returns.
+        returns: pd.Series (or array) of periodic returns.
         risk_free_rate: Risk-free rate per year (e.g. 0.02 for 2%).
         periods_per_year: Number of periods per year (252 for daily, ~390 for intraday minutes).
 
     Returns:
-        Sharpe ratio value.
+        Sharpe ratio value (sample std, ddof=1).
     """
-    excess_returns = returns - (risk_free_rate / periods_per_year)
-    mean = excess_returns.mean()
-    std = excess_returns.std()
-
-    if std == 0:
-        return 0.0
-
-    sharpe = (mean / std) * np.sqrt(periods_per_year)
-    return sharpe
+    return _sharpe_from_array(np.asarray(returns, dtype=np.float64), risk_free_rate, periods_per_year)
 
 
 def max_drawdown(equity_curve: pd.Series) -> float:
@@ -59,9 +84,7 @@ def max_drawdown(equity_curve: pd.Series) -> float:
     Returns:
         Maximum drawdown (as negative percentage).
     """
-    rolling_max = equity_curve.cummax()
-    drawdown = equity_curve / rolling_max - 1.0
-    return drawdown.min()
+    return _max_drawdown_from_array(np.asarray(equity_curve, dtype=np.float64))
 
 
 def cagr(equity_curve: pd.Series, periods_per_year: int = 252) -> float:
@@ -98,11 +121,11 @@ def summarize_performance(equity_curve: pd.Series, risk_free_rate: float = 0.0,
     Returns:
         Dict with Sharpe, MDD, CAGR, total return.
     """
-    returns = compute_returns(equity_curve)
-    sharpe = sharpe_ratio(returns, risk_free_rate, periods_per_year)
-    mdd = max_drawdown(equity_curve)
+    equity = equity_curve.to_numpy(dtype=np.float64)
+    sharpe = _sharpe_from_array(_returns_array(equity), risk_free_rate, periods_per_year)
+    mdd = _max_drawdown_from_array(equity)
     growth = cagr(equity_curve, periods_per_year)
-    total_return = equity_curve.iloc[-1] / equity_curve.iloc[0] - 1
+    total_return = equity[-1] / equity[0] - 1
 
     return {
         "Sharpe Ratio": sharpe,
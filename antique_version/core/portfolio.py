@@ -5,20 +5,46 @@ Portfolio con gestión de caja y trades abiertos/cerrados.
 Correcciones:
 - Usar 'ticker' (coincide con Trade) en vez de 'symbol' para acceder a atributos.
 - Al abrir trades, respetar la caja disponible (si el coste excede, ajustar tamaño).
+- Índice secundario (ticker, dirección) -> ids de trades abiertos: consultas y
+  cierres de posiciones opuestas O(1), sin copiar ni filtrar trades_open.
+- Atributos numéricos de los trades abiertos en arrays paralelos (SoA) para
+  comprobar SL/TP y calcular la equity de todos ellos con unas pocas
+  operaciones vectorizadas.
+- Con un único trade abierto (SIZING.max_positions = 1) la equity se calcula
+  directamente sobre él (_fast_trade), sin arrays ni búsquedas por ticker.
 """
 
 from __future__ import annotations
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from core.trade import Trade
 import datetime as dt
+import numpy as np
 
 
 class Portfolio:
     def __init__(self, initial_capital: float = 10_000.0):
         self.initial_capital = initial_capital
         self.cash = initial_capital
-        self.trades_open: Dict[str, Trade] = {}
+        self.trades_open: Dict[int, Trade] = {}
         self.trades_closed: List[Trade] = []
+        # Ids de trades abiertos por (ticker, dirección)
+        self._open_by_ticker_dir: Dict[Tuple[str, str], List[int]] = {}
+
+        # SoA de trades abiertos: fila k <-> trade self._ids[k] (filas [0, _n_open) válidas).
+        # SL/TP desactivados se guardan como NaN (nunca disparan).
+        self._ticker_ids: Dict[str, int] = {}
+        self._row_of: Dict[int, int] = {}
+        self._n_open = 0
+        cap = 16
+        self._ids = np.empty(cap, dtype=np.int64)
+        self._ticker_idx = np.empty(cap, dtype=np.int32)
+        self._dir_sign = np.empty(cap, dtype=np.int8)
+        self._entry = np.empty(cap, dtype=np.float64)
+        self._size = np.empty(cap, dtype=np.float64)
+        self._sl = np.empty(cap, dtype=np.float64)
+        self._tp = np.empty(cap, dtype=np.float64)
+        # El trade abierto si hay exactamente uno, si no None
+        self._fast_trade: Optional[Trade] = None
 
     def open_trade(
         self,
@@ -45,26 +71,115 @@ class Portfolio:
             size=size,
             stop_loss=stop_loss,
             take_profit=take_profit,
-            entry_time=time or dt.datetime.utcnow(),
+            entry_time=time,
         )
 
         self.cash -= cost
-        self.trades_open[trade.trade_id] = trade
+        self.register_open_trade(trade)
         return trade
 
+    def register_open_trade(self, trade: Trade) -> None:
+        """Da de alta un trade ya abierto (sin mover caja)."""
+        self.trades_open[trade.trade_id] = trade
+        self._open_by_ticker_dir.setdefault((trade.ticker, trade.direction), []).append(trade.trade_id)
+
+        k = self._n_open
+        if k == len(self._ids):
+            self._grow()
+        self._ids[k] = trade.trade_id
+        self._ticker_idx[k] = self.ticker_id(trade.ticker)
+        self._dir_sign[k] = trade._dir_sign
+        self._entry[k] = trade.entry_price
+        self._size[k] = trade.size
+        self._sl[k] = trade.stop_loss if trade.stop_loss is not None else np.nan
+        self._tp[k] = trade.take_profit if trade.take_profit is not None else np.nan
+        self._row_of[trade.trade_id] = k
+        self._n_open = k + 1
+        self._fast_trade = trade if k == 0 else None
+
+    def ticker_id(self, symbol: str) -> int:
+        """Índice entero estable del ticker (posición en los arrays de precios por ticker)."""
+        tid = self._ticker_ids.get(symbol)
+        if tid is None:
+            tid = self._ticker_ids[symbol] = len(self._ticker_ids)
+        return tid
+
+    def _grow(self) -> None:
+        cap = 2 * len(self._ids)
+        for name in ("_ids", "_ticker_idx", "_dir_sign", "_entry", "_size", "_sl", "_tp"):
+            old = getattr(self, name)
+            new = np.empty(cap, dtype=old.dtype)
+            new[: self._n_open] = old[: self._n_open]
+            setattr(self, name, new)
+
+    def _remove_row(self, trade_id: int) -> None:
+        # Borrado O(1): la última fila ocupa el hueco
+        k = self._row_of.pop(trade_id)
+        last = self._n_open - 1
+        if k != last:
+            for arr in (self._ids, self._ticker_idx, self._dir_sign, self._entry, self._size, self._sl, self._tp):
+                arr[k] = arr[last]
+            self._row_of[int(self._ids[k])] = k
+        self._n_open = last
+        self._fast_trade = self.trades_open[int(self._ids[0])] if last == 1 else None
+
+    def has_long(self, symbol: str) -> bool:
+        return bool(self._open_by_ticker_dir.get((symbol, "long")))
+
+    def has_short(self, symbol: str) -> bool:
+        return bool(self._open_by_ticker_dir.get((symbol, "short")))
+
     def update_market(self, symbol: str, price: float, time: dt.datetime) -> None:
-        for trade_id, trade in list(self.trades_open.items()):
-            if trade.ticker == symbol:
-                closed = trade.check_exit(price, time)
-                if closed:
-                    self._settle_trade(trade)
+        tid = self._ticker_ids.get(symbol)
+        if tid is None or self._n_open == 0:
+            return
+        n = self._n_open
+        if len(self._ticker_ids) == 1:
+            # Un único ticker registrado: todas las filas son suyas, sin array de precios
+            prices = np.broadcast_to(float(price), (n,))
+        else:
+            prices = np.where(self._ticker_idx[:n] == tid, price, np.nan)
+        self._settle_exits(prices, time)
+
+    def update_market_prices(self, price_by_ticker: np.ndarray, time: dt.datetime) -> None:
+        """
+        Comprueba SL/TP de todos los trades abiertos a la vez.
 
-    def close_trade(self, trade_id: str, price: float, time: Optional[dt.datetime] = None) -> None:
+        Args:
+            price_by_ticker: Precio actual por ticker_id (NaN si no hay cotización).
+            time: Timestamp de la barra.
+        """
+        if self._n_open == 0:
+            return
+        self._settle_exits(price_by_ticker[self._ticker_idx[: self._n_open]], time)
+
+    def _settle_exits(self, prices: np.ndarray, time: dt.datetime) -> None:
+        n = self._n_open
+        sign = self._dir_sign[:n]
+        # Comparaciones con NaN (sin precio o nivel desactivado) son falsas
+        sl_hit = sign * (prices - self._sl[:n]) <= 0
+        tp_hit = sign * (prices - self._tp[:n]) >= 0
+        rows = np.flatnonzero(sl_hit | tp_hit)
+        if rows.size == 0:
+            return
+        # Resolver ids antes de liquidar: liquidar reordena las filas
+        for trade_id, price in zip(self._ids[rows].tolist(), prices[rows].tolist()):
+            trade = self.trades_open[trade_id]
+            trade.close(price, time)
+            self._settle_trade(trade)
+
+    def close_trade(self, trade_id: int, price: float, time: Optional[dt.datetime] = None) -> None:
         if trade_id in self.trades_open:
             trade = self.trades_open[trade_id]
             trade.close(price, time)
             self._settle_trade(trade)
 
+    def close_trades(self, symbol: str, direction: str, price: float, time: Optional[dt.datetime] = None) -> None:
+        """Cierra todos los trades abiertos de un ticker en una dirección."""
+        # Se saca la lista del índice antes de cerrar: nada que copiar ni filtrar
+        for trade_id in self._open_by_ticker_dir.pop((symbol, direction), ()):
+            self.close_trade(trade_id, price, time)
+
     def _settle_trade(self, trade: Trade) -> None:
         if trade.status != "closed":
             return
@@ -72,13 +187,60 @@ class Portfolio:
         self.cash += cost + (trade.pnl or 0.0)
         self.trades_closed.append(trade)
         del self.trades_open[trade.trade_id]
+        ids = self._open_by_ticker_dir.get((trade.ticker, trade.direction))
+        if ids:
+            ids.remove(trade.trade_id)
+        self._remove_row(trade.trade_id)
+
+    def _unrealized(self, prices) -> np.ndarray:
+        """PnL no realizado de cada fila abierta (prices: escalar o array por fila)."""
+        n = self._n_open
+        return self._dir_sign[:n] * (prices - self._entry[:n]) * self._size[:n]
 
     def equity(self, current_prices: Dict[str, float]) -> float:
-        equity = self.cash
-        for trade in self.trades_open.values():
-            if trade.ticker in current_prices:
-                equity += trade.unrealized_pnl(current_prices[trade.ticker])
-        return equity
+        fast = self._fast_trade
+        if fast is not None:
+            price = current_prices.get(fast.ticker)
+            if price is None:
+                return self.cash
+            # Un precio NaN se propaga, como en equity_single
+            return self.cash + fast.unrealized_pnl(price)
+        n = self._n_open
+        if n == 0:
+            return self.cash
+        # Precio por ticker_id; los tickers sin cotización no suman, un NaN se propaga
+        price_by_ticker = np.zeros(len(self._ticker_ids))
+        quoted = np.zeros(len(self._ticker_ids), dtype=bool)
+        for symbol, price in current_prices.items():
+            tid = self._ticker_ids.get(symbol)
+            if tid is not None:
+                price_by_ticker[tid] = price
+                quoted[tid] = True
+        idx = self._ticker_idx[:n]
+        unreal = self._unrealized(price_by_ticker[idx])
+        return self.cash + float(unreal[quoted[idx]].sum())
+
+    def equity_single(self, price: float, ticker: str) -> float:
+        """Equity con un único precio (motor de un solo instrumento): sin dict de precios."""
+        fast = self._fast_trade
+        if fast is not None:
+            return self.cash + fast.unrealized_pnl(price) if fast.ticker == ticker else self.cash
+        tid = self._ticker_ids.get(ticker)
+        n = self._n_open
+        if tid is None or n == 0:
+            return self.cash
+        mask = self._ticker_idx[:n] == tid
+        return self.cash + float(self._unrealized(price)[mask].sum())
+
+    def closed_pnls(self) -> np.ndarray:
+        """PnL de los trades cerrados calculado en una sola operación vectorizada."""
+        closed = self.trades_closed
+        n = len(closed)
+        signs = np.fromiter((t._dir_sign for t in closed), dtype=np.int8, count=n)
+        entry = np.fromiter((t.entry_price for t in closed), dtype=np.float64, count=n)
+        exit_ = np.fromiter((t.exit_price for t in closed), dtype=np.float64, count=n)
+        size = np.fromiter((t.size for t in closed), dtype=np.float64, count=n)
+        return signs * (exit_ - entry) * size
 
     def summary(self) -> Dict[str, float]:
         return {
@@ -86,5 +248,5 @@ class Portfolio:
             "cash": self.cash,
             "open_trades": len(self.trades_open),
             "closed_trades": len(self.trades_closed),
-            "realized_pnl": sum(t.pnl for t in self.trades_closed if t.pnl is not None),
+            "realized_pnl": float(self.closed_pnls().sum()),
         }
@@ -10,27 +10,34 @@ Responsibilities:
 from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Optional
-import uuid
+from itertools import count
 import datetime as dt
 
 
-@dataclass
+# Process-wide monotonic trade ids (cheaper than uuid4 and hashed as ints)
+_trade_id_counter = count(1)
+
+
+@dataclass(slots=True)
 class Trade:
     """
     A trade record for backtesting or paper trading.
 
     Attributes:
-        trade_id: Unique identifier for the trade.
+        trade_id: Unique (monotonic) identifier for the trade.
         ticker: Instrument ticker (e.g. "SPY", "TSLA").
         direction: "long" or "short".
         entry_price: Price at which the position is opened.
         size: Number of units/contracts/shares.
         stop_loss: Stop-loss level (absolute price).
         take_profit: Take-profit level (absolute price).
-        entry_time: Timestamp of entry.
+        entry_time: Timestamp of entry (always supplied by the backtest engine).
         exit_price: Price at which the trade was closed.
         exit_time: Timestamp of exit.
         status: "open" or "closed".
+
+    The direction is also stored internally as a sign (+1 long, -1 short),
+    so PnL is `sign * (price - entry_price) * size` without branching.
     """
     ticker: str
     direction: str
@@ -38,14 +45,23 @@ class Trade:
     size: float
     stop_loss: Optional[float] = None
     take_profit: Optional[float] = None
-    entry_time: dt.datetime = field(default_factory=dt.datetime.utcnow)
+    entry_time: Optional[dt.datetime] = None
 
     # System generated fields
-    trade_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    trade_id: int = field(default_factory=lambda: next(_trade_id_counter))
     exit_price: Optional[float] = None
     exit_time: Optional[dt.datetime] = None
     status: str = "open"
     pnl: Optional[float] = None  # Profit and loss in currency
+    _dir_sign: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if self.direction == "long":
+            self._dir_sign = 1
+        elif self.direction == "short":
+            self._dir_sign = -1
+        else:
+            raise ValueError("Invalid direction: must be 'long' or 'short'")
 
     def check_exit(self, current_price: float, current_time: dt.datetime) -> bool:
         """
@@ -61,23 +77,13 @@ class Trade:
         if self.status == "closed":
             return False
 
-        # Stop-loss logic
-        if self.stop_loss is not None:
-            if self.direction == "long" and current_price <= self.stop_loss:
-                self.close(current_price, current_time)
-                return True
-            if self.direction == "short" and current_price >= self.stop_loss:
-                self.close(current_price, current_time)
-                return True
-
-        # Take-profit logic
-        if self.take_profit is not None:
-            if self.direction == "long" and current_price >= self.take_profit:
-                self.close(current_price, current_time)
-                return True
-            if self.direction == "short" and current_price <= self.take_profit:
-                self.close(current_price, current_time)
-                return True
+        # SL/TP with the direction sign: one comparison per level for long and short
+        s = self._dir_sign
+        sl_hit = self.stop_loss is not None and s * (current_price - self.stop_loss) <= 0
+        tp_hit = self.take_profit is not None and s * (current_price - self.take_profit) >= 0
+        if sl_hit or tp_hit:
+            self.close(current_price, current_time)
+            return True
 
         return False
 
@@ -87,22 +93,17 @@ class Trade:
 
         Args:
             price: Exit price.
-            time: Exit time (defaults to now).
+            time: Exit time (None if not supplied; the clock is never read here).
         """
         if self.status == "closed":
             return
 
         self.exit_price = price
-        self.exit_time = time or dt.datetime.utcnow()
+        self.exit_time = time
         self.status = "closed"
 
         # Calculate PnL
-        if self.direction == "long":    
-            self.pnl = (self.exit_price - self.entry_price) * self.size
-        elif self.direction == "short":
-            self.pnl = (self.entry_price - self.exit_price) * self.size
-        else:
-            raise ValueError("Invalid direction: must be 'long' or 'short'")
+        self.pnl = self._dir_sign * (self.exit_price - self.entry_price) * self.size
 
     def unrealized_pnl(self, current_price: float) -> float:
         """
@@ -117,9 +118,4 @@ class Trade:
         if self.status == "closed":
             return 0.0
 
-        if self.direction == "long":
-            return (current_price - self.entry_price) * self.size
-        elif self.direction == "short":
-            return (self.entry_price - current_price) * self.size
-        else:
-            raise ValueError("Invalid direction: must be 'long' or 'short'")
+        return self._dir_sign * (current_price - self.entry_price) * self.size
@@ -6,17 +6,35 @@ Objetivos:
 - Guardar índice como 'timestamp' (UTC) y columnas OHLCV planas en minúsculas.
 - Al leer la caché, tolerar cabeceras multi-nivel y formatos "raros".
 - Si la caché no es fiable, borrar y redescargar.
+- Con pyarrow instalado: caché en Parquet (zstd) y lectura de CSV con el lector de PyArrow.
+- Opcional: DataLoader.get_polars() con un pipeline perezoso de Polars.
+- get() memoiza en memoria cada (symbol, interval, period) ya cargado.
+- Columna 'in_session' (sesión regular del perfil de mercado) calculada al cargar.
+- OHLC en float32 y volume en int32 cuando es posible.
 """
 
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 import yfinance as yf
 from pathlib import Path
-from typing import Optional, Tuple, List, Union
+from typing import Dict, Optional, Tuple, List, Union
 
 from config import settings
 
+try:
+    import pyarrow.csv as pv
+    import pyarrow.types as pat
+except ImportError:  # pragma: no cover - pyarrow es opcional
+    pv = None
+    pat = None
+
+try:
+    import polars as pl
+except ImportError:  # pragma: no cover - polars es opcional
+    pl = None
+
 
 OHLC_MAP = {
     "open": "open",
@@ -29,6 +47,10 @@ OHLC_MAP = {
     "volume": "volume",
 }
 
+_PRICE_COLS = ("open", "high", "low", "close", "adj_close")
+_INT32_MAX = np.iinfo(np.int32).max
+
+
 def _to_lower_str(x: Union[str, tuple]) -> str:
     """Convierte nombres de columna (incluido MultiIndex) a una clave simple en minúsculas."""
     if isinstance(x, tuple):
@@ -37,6 +59,31 @@ def _to_lower_str(x: Union[str, tuple]) -> str:
     return str(x).strip().lower()
 
 
+def _ohlc_name(c: str) -> str:
+    """
+    Nombre estándar de una columna ya en minúsculas: 'open', 'close', etc. si es
+    una variante OHLCV ('close', 'spy_close', 'adj close_spy', ...), o el mismo
+    nombre si no lo es.
+    """
+    # Casos directos: 'open', 'close', etc.
+    if c in OHLC_MAP:
+        return OHLC_MAP[c]
+    # Casos 'close_spy', 'spy_close', 'adj close_spy', etc.
+    tokens = c.replace("-", "_").split("_")
+    # Busca token OHLC en los componentes
+    for i in range(len(tokens)):
+        candidate = " ".join(tokens[i:])  # 'close', 'adj close', etc.
+        candidate = candidate.replace("  ", " ").strip()
+        if candidate in OHLC_MAP:
+            return OHLC_MAP[candidate]
+        # también probar uniendo con '_'
+        candidate2 = "_".join(tokens[i:])
+        if candidate2 in OHLC_MAP:
+            return OHLC_MAP[candidate2]
+    # dejarlo como está si no es OHLCV
+    return c
+
+
 def _standardize_columns(df: pd.DataFrame) -> pd.DataFrame:
     """
     - Aplana MultiIndex si existe.
@@ -53,32 +100,7 @@ def _standardize_columns(df: pd.DataFrame) -> pd.DataFrame:
         df.columns = [_to_lower_str(c) for c in df.columns]
 
     # Intentar mapear nombres a OHLC_MAP
-    new_cols = {}
-    for c in df.columns:
-        # Casos directos: 'open', 'close', etc.
-        if c in OHLC_MAP:
-            new_cols[c] = OHLC_MAP[c]
-            continue
-        # Casos 'close_spy', 'spy_close', 'adj close_spy', etc.
-        tokens = c.replace("-", "_").split("_")
-        # Busca token OHLC en los componentes
-        found = None
-        for i in range(len(tokens)):
-            candidate = " ".join(tokens[i:])  # 'close', 'adj close', etc.
-            candidate = candidate.replace("  ", " ").strip()
-            if candidate in OHLC_MAP:
-                found = OHLC_MAP[candidate]
-                break
-            # también probar uniendo con '_'
-            candidate2 = "_".join(tokens[i:])
-            if candidate2 in OHLC_MAP:
-                found = OHLC_MAP[candidate2]
-                break
-        if found:
-            new_cols[c] = found
-        else:
-            # dejarlo como está si no es OHLCV
-            new_cols[c] = c
+    new_cols = {c: _ohlc_name(c) for c in df.columns}
 
     df = df.rename(columns=new_cols)
 
@@ -96,13 +118,137 @@ def _standardize_columns(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+def _compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Precios OHLC en float32 (yfinance ya los entrega con precisión float32, así
+    que no se pierde nada) y volume en int32 si es entero, sin NaN y cabe.
+    Mitad de memoria y de ancho de banda por columna para los kernels.
+    """
+    prices = [c for c in _PRICE_COLS if c in df.columns]
+    if prices:
+        df[prices] = df[prices].astype(np.float32)
+    if "volume" in df.columns:
+        vol = df["volume"].to_numpy()
+        if (
+            vol.size
+            and not np.isnan(vol).any()
+            and vol.min() >= 0
+            and vol.max() <= _INT32_MAX
+            and (vol == np.round(vol)).all()
+        ):
+            df["volume"] = vol.astype(np.int32)
+    return df
+
+
+def _session_profile(symbol: str) -> Optional[dict]:
+    """
+    Perfil de mercado del símbolo si su sesión regular debe filtrarse, o None
+    (filtro desactivado, símbolo fuera del universo o perfil sin filtro).
+    """
+    if not settings.APPLY_SESSION_FILTER:
+        return None
+    try:
+        profile = settings.market_profile_for(symbol)
+    except KeyError:
+        return None
+    return profile if profile["apply_session_filter"] else None
+
+
+def _add_session_column(df: pd.DataFrame, symbol: str) -> pd.DataFrame:
+    """
+    Añade 'in_session' (bool): barra dentro de la sesión regular del perfil de
+    mercado del símbolo. Todo True si el filtro de sesión no aplica.
+
+    Se calcula una sola vez, vectorizado sobre el índice, para que el código
+    posterior consulte mask[i] en vez de repetir aritmética de fechas.
+    Las barras se etiquetan con su hora de apertura: sesión = [inicio, fin).
+    """
+    profile = _session_profile(symbol)
+    if profile is None:
+        df["in_session"] = True
+        return df
+
+    local = df.index.tz_convert(profile["timezone"])
+    minutes = local.hour * 60 + local.minute
+    start_h, start_m = profile["session_start"]
+    end_h, end_m = profile["session_end"]
+    df["in_session"] = (minutes >= start_h * 60 + start_m) & (minutes < end_h * 60 + end_m)
+    return df
+
+
+def _standardize_polars(lf: "pl.LazyFrame") -> "pl.LazyFrame":
+    """
+    Equivalente a _standardize_columns sobre un LazyFrame: un único select con
+    renombrado y descarte de duplicados, sin frames intermedios.
+    """
+    sources: List[str] = []
+    names: List[str] = []
+    for c in lf.collect_schema().names():
+        new = "timestamp" if c == "timestamp" else _ohlc_name(_to_lower_str(c))
+        if new in names:
+            continue
+        sources.append(c)
+        names.append(new)
+
+    # Asegurar 'close' si hay alguna variante plausible
+    if "close" not in names:
+        candidates = [i for i, name in enumerate(names) if "close" in name]
+        if candidates:
+            names[candidates[0]] = "close"
+
+    # 'timestamp' primero, como get().reset_index() (en Parquet el índice va al final)
+    if "timestamp" in names:
+        i = names.index("timestamp")
+        sources.insert(0, sources.pop(i))
+        names.insert(0, names.pop(i))
+
+    return lf.select([pl.col(c).alias(new) for c, new in zip(sources, names)])
+
+
+def _session_expr_polars(symbol: str) -> "pl.Expr":
+    """Expresión Polars de _add_session_column: 'in_session' sobre 'timestamp' (UTC)."""
+    profile = _session_profile(symbol)
+    if profile is None:
+        return pl.lit(True).alias("in_session")
+
+    # Polars espera el nombre IANA, no el objeto ZoneInfo de settings
+    local = pl.col("timestamp").dt.convert_time_zone(str(profile["timezone"]))
+    minutes = local.dt.hour().cast(pl.Int32) * 60 + local.dt.minute().cast(pl.Int32)
+    start_h, start_m = profile["session_start"]
+    end_h, end_m = profile["session_end"]
+    return ((minutes >= start_h * 60 + start_m) & (minutes < end_h * 60 + end_m)).alias("in_session")
+
+
+def _compact_dtypes_polars(df: "pl.DataFrame") -> "pl.DataFrame":
+    """Mismas reglas que _compact_dtypes (OHLC float32, volume int32 si cabe) sobre Polars."""
+    prices = [c for c in _PRICE_COLS if c in df.columns]
+    if prices:
+        df = df.with_columns([pl.col(c).cast(pl.Float32) for c in prices])
+    if "volume" in df.columns and df.height and df["volume"].dtype != pl.Int32:
+        vol = df["volume"].cast(pl.Float64)
+        if (
+            vol.null_count() == 0
+            and not vol.is_nan().any()
+            and vol.min() >= 0
+            and vol.max() <= _INT32_MAX
+            and (vol == vol.round()).all()
+        ):
+            df = df.with_columns(pl.col("volume").cast(pl.Int32))
+    return df
+
 class DataLoader:
     def __init__(self, raw_dir: Optional[Path] = None) -> None:
         self.raw_dir = raw_dir or settings.RAW_DATA_DIR
+        # Memo en memoria de get(): (symbol, interval, period) -> DataFrame
+        self._mem: Dict[Tuple[str, str, str], pd.DataFrame] = {}
 
     def _cache_path(self, symbol: str, interval: str) -> Path:
-        safe_symbol = symbol.replace("=", "-").replace("/", "-")
-        return Path(self.raw_dir) / f"{safe_symbol}_{interval}.csv"
+        # Mismo nombre que settings.path_for_raw_csv, dentro de raw_dir
+        return Path(self.raw_dir) / settings.path_for_raw_csv(symbol, interval).name
+
+    def _parquet_path(self, symbol: str, interval: str) -> Path:
+        # Mismo nombre que settings.path_for_raw_parquet, dentro de raw_dir
+        return Path(self.raw_dir) / settings.path_for_raw_parquet(symbol, interval).name
 
     def _download_from_yf(self, symbol: str, interval: str, period: str) -> pd.DataFrame:
         df = yf.download(
@@ -127,16 +273,33 @@ class DataLoader:
         if "close" not in df.columns:
             raise ValueError(f"Downloaded data missing 'close' column for {symbol}. Columns: {list(df.columns)}")
 
-        return df
+        return _add_session_column(_compact_dtypes(df), symbol)
 
     def _try_read_cached_csv(self, path: Path) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
         """
         Intenta leer CSV en varios formatos:
-        - Con índice 'timestamp'
+        - Con índice 'timestamp' (primero con PyArrow si está disponible)
         - Con 2 filas de cabecera (MultiIndex)
         - Primera columna como índice
         Devuelve (df, error). Si df es None, error describe el problema.
         """
+        # 0) Lector CSV de PyArrow: mismo formato preferido, bastante más rápido
+        #    que el motor C de pandas y sin re-parsear timestamps.
+        if pv is not None:
+            try:
+                table = pv.read_csv(
+                    path, convert_options=pv.ConvertOptions(timestamp_parsers=[pv.ISO8601])
+                )
+                if "timestamp" in table.column_names and pat.is_timestamp(
+                    table.schema.field("timestamp").type
+                ):
+                    df = table.to_pandas().set_index("timestamp")
+                    df.index = pd.to_datetime(df.index, utc=True)
+                    df = _standardize_columns(df)
+                    return df, None
+            except Exception:
+                pass
+
         # 1) Formato preferido (guardado por este loader)
         try:
             df = pd.read_csv(path, parse_dates=["timestamp"], index_col="timestamp")
@@ -192,14 +355,46 @@ class DataLoader:
         period: Optional[str] = None,
         use_cache: bool = True,
     ) -> pd.DataFrame:
+        """
+        OHLCV de `symbol` con índice 'timestamp' (UTC).
+
+        Cada (symbol, interval, period) se carga una sola vez por DataLoader: las
+        llamadas siguientes devuelven el mismo DataFrame (p.ej. en barridos de
+        parámetros), así que no debe modificarse in situ. use_cache=False ignora
+        ambas cachés y vuelve a descargar.
+        """
         interval = interval or settings.DEFAULT_INTERVAL
         period = period or settings.yf_max_period_for_interval(interval)
+        key = (symbol, interval, period)
+        if use_cache and key in self._mem:
+            return self._mem[key]
+
+        df = self._load(symbol, interval, period, use_cache)
+        if "in_session" not in df.columns:
+            # Cachés anteriores a la máscara de sesión
+            df = _add_session_column(df, symbol)
+        self._mem[key] = df
+        return df
+
+    def _load(self, symbol: str, interval: str, period: str, use_cache: bool) -> pd.DataFrame:
         cache_file = self._cache_path(symbol, interval)
+        parquet_file = self._parquet_path(symbol, interval)
+
+        # Caché Parquet: tipos e índice UTC se conservan, sin parsear texto
+        if use_cache and pv is not None and parquet_file.exists():
+            try:
+                df = pd.read_parquet(parquet_file, engine="pyarrow")
+                if "close" in df.columns:
+                    return df
+            except Exception:
+                pass
+            parquet_file.unlink(missing_ok=True)
 
         if use_cache and cache_file.exists():
             df, err = self._try_read_cached_csv(cache_file)
             if df is not None and "close" in df.columns:
-                return df
+                # El CSV no guarda tipos
+                return _compact_dtypes(df)
             # Si no se pudo leer o falta 'close', redescargar
             try:
                 cache_file.unlink(missing_ok=True)
@@ -209,5 +404,55 @@ class DataLoader:
         # Descarga limpia y guardado normalizado
         df = self._download_from_yf(symbol, interval, period)
         cache_file.parent.mkdir(parents=True, exist_ok=True)
-        df.to_csv(cache_file, index_label="timestamp")
+        if pv is not None:
+            df.to_parquet(parquet_file, engine="pyarrow", compression="zstd")
+        else:
+            df.to_csv(cache_file, index_label="timestamp")
         return df
+
+    def get_polars(
+        self,
+        symbol: str,
+        interval: Optional[str] = None,
+        period: Optional[str] = None,
+        use_cache: bool = True,
+    ) -> "pl.DataFrame":
+        """
+        Igual que get() pero devuelve un polars.DataFrame con columna 'timestamp' (UTC).
+
+        Si hay caché Parquet o CSV en el formato de este loader se lee con un
+        LazyFrame (scan + renombrado + deduplicado de timestamps en una pasada,
+        motor streaming), con los mismos tipos compactos y columna 'in_session'
+        que get(). En cualquier otro caso se delega en get().
+        """
+        if pl is None:
+            raise ImportError("polars is required for DataLoader.get_polars()")
+
+        interval = interval or settings.DEFAULT_INTERVAL
+        cache_file = self._cache_path(symbol, interval)
+        parquet_file = self._parquet_path(symbol, interval)
+
+        lf = None
+        if use_cache and parquet_file.exists():
+            lf = pl.scan_parquet(parquet_file)
+        elif use_cache and cache_file.exists():
+            scanned = pl.scan_csv(cache_file)
+            if "timestamp" in scanned.collect_schema().names():
+                lf = scanned.with_columns(pl.col("timestamp").str.to_datetime(time_zone="UTC"))
+
+        if lf is not None:
+            try:
+                lf = _standardize_polars(lf).unique(subset=["timestamp"], keep="first", maintain_order=True)
+                if "in_session" not in lf.collect_schema().names():
+                    # CSV o cachés anteriores a la máscara de sesión, como en get()
+                    lf = lf.with_columns(_session_expr_polars(symbol))
+                df = lf.collect(engine="streaming")
+                if "close" in df.columns:
+                    # El CSV no guarda tipos; en Parquet ya vienen compactados
+                    return _compact_dtypes_polars(df)
+            except (pl.exceptions.PolarsError, OSError):
+                # Caché ilegible con Polars (esquema o timestamps inesperados): ruta pandas
+                pass
+
+        # Formatos heredados / descarga: ruta pandas
+        return pl.from_pandas(self.get(symbol, interval, period, use_cache).reset_index())
@@ -6,13 +6,14 @@ Parámetros solicitados:
 - Máximo 500 USD por operación
 - Stop-loss: 2%
 - Take-profit: 4%
-Guarda resultados (equity y trades) en /reports.
+Guarda resultados (equity en CSV y trades en Parquet) en /reports.
 """
 
 from config import settings
-from datafeed.loader import DataLoader
+from datafeed.loader import DataLoader, pl
 from strategies.sma_crossover import SMACrossoverStrategy
 from backtest.engine import BacktestEngine
+import numpy as np
 import pandas as pd
 
 # Instrumento a probar (puedes cambiarlo si quieres otro del universo)
@@ -24,13 +25,16 @@ STOP_LOSS_PCT = 0.02
 TAKE_PROFIT_PCT = 0.04
 
 def main():
-    # 1) Datos
+    # 1) Datos: en Polars (columnar, Arrow) si está instalado; el motor acepta ambos.
+    #    Se reutiliza la caché de data/raw (la primera ejecución descarga y la
+    #    guarda): get_polars solo lee con Polars desde ese fichero; sin caché
+    #    descarga con pandas y convierte. Borrar la caché para redescargar.
     loader = DataLoader()
-    data = loader.get(
+    load = loader.get_polars if pl is not None else loader.get
+    data = load(
         INSTRUMENT,
         interval=settings.DEFAULT_INTERVAL,
         period=settings.DEFAULT_PERIOD,
-        use_cache=False
     )
 
     # 2) Estrategia
@@ -54,22 +58,23 @@ def main():
     settings.REPORTS_DIR.mkdir(parents=True, exist_ok=True)
     equity_curve.to_csv(settings.REPORTS_DIR / "equity_curve.csv")
 
-    # Guardar trades cerrados
-    trades_data = []
-    for t in engine.portfolio.trades_closed:
-        trades_data.append(
-            {
-                "symbol": t.ticker,
-                "direction": t.direction,
-                "entry_time": t.entry_time,
-                "entry_price": t.entry_price,
-                "exit_time": t.exit_time,
-                "exit_price": t.exit_price,
-                "size": t.size,
-                "pnl": t.pnl,
-            }
-        )
-    pd.DataFrame(trades_data).to_csv(settings.REPORTS_DIR / "trades.csv", index=False)
+    # Guardar trades cerrados: columnas construidas directamente (sin lista de dicts)
+    # y escritas en Parquet (tipos conservados, fichero más pequeño y lectura rápida)
+    closed = engine.portfolio.trades_closed
+    n = len(closed)
+    trades_df = pd.DataFrame(
+        {
+            "symbol": np.array([t.ticker for t in closed], dtype=object),
+            "direction": np.array([t.direction for t in closed], dtype=object),
+            "entry_time": pd.DatetimeIndex([t.entry_time for t in closed]),
+            "entry_price": np.fromiter((t.entry_price for t in closed), dtype=np.float64, count=n),
+            "exit_time": pd.DatetimeIndex([t.exit_time for t in closed]),
+            "exit_price": np.fromiter((t.exit_price for t in closed), dtype=np.float64, count=n),
+            "size": np.fromiter((t.size for t in closed), dtype=np.float64, count=n),
+            "pnl": np.fromiter((t.pnl for t in closed), dtype=np.float64, count=n),
+        }
+    )
+    trades_df.to_parquet(settings.REPORTS_DIR / "trades.parquet", index=False)
     print(f"Archivos guardados en: {settings.REPORTS_DIR}")
 
 if __name__ == "__main__":
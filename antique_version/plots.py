@@ -17,18 +17,28 @@ EQUITY_PNG = settings.VIS_DIR / "equity_curve.png"
 def main():
     settings.VIS_DIR.mkdir(parents=True, exist_ok=True)
 
-    trades_path = settings.REPORTS_DIR / "trades.csv"
+    trades_path = settings.REPORTS_DIR / "trades.parquet"
+    legacy_trades_path = settings.REPORTS_DIR / "trades.csv"
     equity_path = settings.REPORTS_DIR / "equity_curve.csv"
 
-    trades_df = pd.read_csv(trades_path, parse_dates=["entry_time", "exit_time"]) if trades_path.exists() else pd.DataFrame()
+    if trades_path.exists():
+        trades_df = pd.read_parquet(trades_path)
+    elif legacy_trades_path.exists():
+        trades_df = pd.read_csv(legacy_trades_path, parse_dates=["entry_time", "exit_time"])
+    else:
+        trades_df = pd.DataFrame()
     equity_df = pd.read_csv(equity_path, index_col=0, parse_dates=True) if equity_path.exists() else pd.DataFrame()
 
     # Símbolo
     symbol = trades_df.loc[0, "symbol"] if not trades_df.empty else list(settings.INSTRUMENTS.keys())[0]
 
-    # Cargar precios con índice 'timestamp'
+    # Cargar precios con índice 'timestamp' (caché Parquet si existe, si no CSV)
     price_csv = settings.path_for_raw_csv(symbol, settings.DEFAULT_INTERVAL)
-    price_df = pd.read_csv(price_csv, parse_dates=["timestamp"], index_col="timestamp")
+    price_parquet = settings.path_for_raw_parquet(symbol, settings.DEFAULT_INTERVAL)
+    if price_parquet.exists():
+        price_df = pd.read_parquet(price_parquet, engine="pyarrow")
+    else:
+        price_df = pd.read_csv(price_csv, parse_dates=["timestamp"], index_col="timestamp")
     price = price_df["close"]
 
     sns.set_style("darkgrid")
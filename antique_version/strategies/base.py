@@ -8,6 +8,8 @@ Responsibilities:
 """
 
 from abc import ABC, abstractmethod
+from typing import Optional
+import numpy as np
 import pandas as pd
 
 
@@ -40,3 +42,21 @@ class Strategy(ABC):
             pd.Series of signals (1 = long, -1 = short, 0 = neutral).
         """
         pass
+
+
+    def generate_signals_numpy(self, close: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Optional fast path: generate signals straight from a close-price array.
+
+        The backtest engine tries this first and skips the pd.Series round-trip
+        when it returns an array; the default returns None, meaning "use
+        `generate_signals`".
+
+        Args:
+            close: float64 array of close prices.
+
+        Returns:
+            int8 array of signals aligned with `close` (1 = long, -1 = short, 0 = neutral),
+            or None if the strategy has no NumPy path.
+        """
+        return None
@@ -3,24 +3,44 @@
 SMA Crossover Strategy (Momentum).
 
 Corrección: usar columna 'close' en minúsculas para compatibilidad con DataLoader.
+Ruta NumPy: rolling().mean() de pandas sobre el array de cierres, sin ida y
+vuelta por DataFrame/Series; mismas señales con o sin numba instalado.
 """
 
+import numpy as np
 import pandas as pd
 from strategies.base import Strategy
 
 
+def rolling_mean(close: np.ndarray, window: int) -> np.ndarray:
+    """
+    rolling(window, min_periods=1).mean() de pandas sobre un array float64.
+
+    Es la implementación de referencia (la misma que la estrategia original) en
+    todos los entornos: los empates exactos entre medias, frecuentes con precios
+    redondeados al tick, dan la misma señal sin replicar aquí sus sumas
+    compensadas.
+    """
+    return pd.Series(close, copy=False).rolling(window, min_periods=1).mean().to_numpy()
+
+
+def crossover_from_sma(short_ma: np.ndarray, long_ma: np.ndarray) -> np.ndarray:
+    """Señales int8 (1 / -1 / 0) a partir de dos medias de rolling_mean; NaN -> 0."""
+    # diff es nuevo: NaN -> 0 in situ y un único np.sign sin máscaras
+    diff = short_ma - long_ma
+    return np.sign(np.nan_to_num(diff, copy=False, nan=0.0)).astype(np.int8)
+
+
 class SMACrossoverStrategy(Strategy):
     def __init__(self, instrument: str, short_window: int = 10, long_window: int = 50):
         super().__init__(instrument, params={"short_window": short_window, "long_window": long_window})
 
     def generate_signals(self, data: pd.DataFrame) -> pd.Series:
-        short_window = self.params["short_window"]
-        long_window = self.params["long_window"]
-
-        short_ma = data["close"].rolling(window=short_window, min_periods=1).mean()
-        long_ma = data["close"].rolling(window=long_window, min_periods=1).mean()
+        close = data["close"].to_numpy(dtype=np.float64)
+        return pd.Series(self.generate_signals_numpy(close), index=data.index)
 
-        signals = pd.Series(0, index=data.index, dtype="int8")
-        signals[short_ma > long_ma] = 1
-        signals[short_ma < long_ma] = -1
-        return signals
+    def generate_signals_numpy(self, close: np.ndarray):
+        close = np.asarray(close, dtype=np.float64)
+        short = rolling_mean(close, self.params["short_window"])
+        long = rolling_mean(close, self.params["long_window"])
+        return crossover_from_sma(short, long)
@@ -20,19 +20,22 @@ def plot_candles_with_indicators(
 ):
     addplots = []
 
-    # Señales buy/sell
+    # Señales buy/sell: series alineadas con data (NaN fuera de la señal),
+    # sin cruces por etiqueta sobre el índice
     if signals is not None:
-        buy_signals = signals[signals == 1]
-        sell_signals = signals[signals == -1]
+        aligned = signals.reindex(data.index)
+        buy_mask = aligned == 1
+        sell_mask = aligned == -1
+        close = data["Close"]
 
-        if not buy_signals.empty:
+        if buy_mask.any():
             addplots.append(
-                mpf.make_addplot(data.loc[buy_signals.index, "Close"],
+                mpf.make_addplot(close.where(buy_mask),
                                  type='scatter', markersize=100, marker='^', color='g')
             )
-        if not sell_signals.empty:
+        if sell_mask.any():
             addplots.append(
-                mpf.make_addplot(data.loc[sell_signals.index, "Close"],
+                mpf.make_addplot(close.where(sell_mask),
                                  type='scatter', markersize=100, marker='v', color='r')
             )
 
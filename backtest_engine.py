@@ -1,5 +1,8 @@
+import numpy as np
 import pandas as pd
 from portfolio import Portfolio
+from trade import Trade
+from backtest_kernel import EVENT_TYPES, simulate
 from Datahandler import Datahandler
 from strategy import Strategy
 from sma_strategy import SMACrossoverStrategy
@@ -25,16 +28,21 @@ class BacktestEngine:
         self.transactions = None
         self.equity_curve = None
 
-    def run_backtest(self):
+    def run_backtest(self, use_kernel=True):
         """
         Runs the backtest simulation.
         
         The process involves:
         1. Getting all historical data from the DataHandler.
-        2. Iterating through the data, one timestamp at a time.
-        3. For each timestamp, the strategy generates a signal based on the data up to that point.
+        2. Generating the signals of every bar once with the strategy's vectorized path.
+        3. Iterating through the bars, reading only scalars from precomputed NumPy arrays.
         4. The portfolio handles the signal and executes a trade if necessary.
-        5. The portfolio's equity is updated at each step.
+        5. Capital and position are kept where they change; the equity curve is
+           built from them and the close prices in one vectorized expression at the end.
+
+        Args:
+            use_kernel (bool): Run steps 3-5 in the compiled simulate() loop when the
+                portfolio is fresh (no trades or equity yet). Results are identical.
         """
         print("Starting backtest...")
         
@@ -43,35 +51,111 @@ class BacktestEngine:
             print("Backtest cannot run. No data loaded.")
             return
 
+        asset_symbol = self.strategy.asset_symbol
+        # One pass over the full dataset instead of re-running the strategy on every prefix
+        signals_arr = self.strategy.generate_signals_vectorized(all_data).to_numpy()
+        # float64 for the portfolio arithmetic, whatever the stored Close dtype
+        close_arr = all_data['Close'].to_numpy(dtype=np.float64)
+        ts_arr = all_data.index.to_numpy()
 
-        #AREA IMPROVEMENT MAKE A MORE EFFICIENT ITERATOR AND DATA ANALYSIS
-        for i in range(len(all_data)):
-            # Get the data available up to the current timestamp
-            current_data = all_data.iloc[:i+1]
-            current_timestamp = all_data.index[i]
-            #print(current_data, current_timestamp)
-            
-            current_price = all_data['Close'].iloc[i]
-            #print(current_price)
-            current_prices = {self.strategy.asset_symbol: current_price}
-
-            signal = self.strategy.generate_signals(current_data)
-
-            #line calling portfolio function to iterate through trades and see if TP o SL activated and close them
-            #deleting them from trades list and adding it as transaction
-            
-            self.portfolio.check_TP_SL(current_prices=current_prices, timestamp=current_timestamp)
+        if use_kernel and not self.portfolio.trades and self.portfolio.equity_curve.empty:
+            self._run_kernel(asset_symbol, signals_arr, close_arr, all_data.index)
+            print("Backtest finished.")
+            self.transactions, self.equity_curve = self.portfolio.get_results()
+            return
 
-            if signal != 'HOLD':
-                self.portfolio.handle_signal(signal, current_timestamp, self.strategy.asset_symbol, current_price, current_prices)
-            else:
-                self.portfolio.calculate_equity(current_prices, current_timestamp)
+        # Only bars with a signal (change-points) need handle_signal. On the HOLD
+        # bars in between just TP/SL can act: find the next bar where some trade
+        # exits in one vectorized pass.
+        # Capital and position only change on the bars run through _process_bar:
+        # keep (bar, capital, position) there and forward-fill them afterwards.
+        n_bars = len(all_data)
+        states = [self._state(asset_symbol, -1)]
+        event_bars = np.flatnonzero(signals_arr != 'HOLD').tolist()
+        i = 0
+        for j in event_bars + [n_bars]:
+            while i < j:
+                k = i + self.portfolio.first_exit_bar(asset_symbol, close_arr[i:j])
+                if k < j:
+                    self._process_bar(asset_symbol, 'HOLD', close_arr[k], ts_arr[k])
+                    states.append(self._state(asset_symbol, k))
+                i = k + 1
+            if j < n_bars:
+                self._process_bar(asset_symbol, signals_arr[j], close_arr[j], ts_arr[j])
+                states.append(self._state(asset_symbol, j))
+            i = j + 1
 
+        # Equity of every bar from the state in force at it: cash + position * close
+        state_bars, state_cash, state_position = (np.array(column) for column in zip(*states))
+        current = np.searchsorted(state_bars, np.arange(n_bars), side='right') - 1
+        self.portfolio.record_equity(state_cash[current] + state_position[current] * close_arr, all_data.index)
 
         print("Backtest finished.")
         
         self.transactions, self.equity_curve = self.portfolio.get_results()
 
+    def _process_bar(self, asset_symbol, signal, current_price, current_timestamp):
+        """
+        Runs one bar through the portfolio: TP/SL check, then the signal.
+        The equity is not recorded here (see run_backtest).
+        """
+        current_prices = {asset_symbol: current_price}
+
+        #line calling portfolio function to iterate through trades and see if TP o SL activated and close them
+        #deleting them from trades list and adding it as transaction
+        self.portfolio.check_TP_SL(current_prices=current_prices, timestamp=current_timestamp)
+
+        if signal != 'HOLD':
+            self.portfolio.handle_signal(signal, current_timestamp, asset_symbol, current_price, current_prices,
+                                         record_equity=False)
+
+    def _state(self, asset_symbol, bar):
+        """
+        Returns (bar, capital, position of asset_symbol) after the bar was processed.
+        """
+        return bar, self.portfolio.current_capital, self.portfolio.position(asset_symbol)
+
+    def _run_kernel(self, asset_symbol, signals_arr, close_arr, index):
+        """
+        Runs the simulation in backtest_kernel.simulate and writes the outcome
+        (transactions, open trades, capital, positions, equity) back into the portfolio.
+        index is the data's DatetimeIndex, reused as the equity curve's index.
+        """
+        ts_arr = index.to_numpy()
+        portfolio = self.portfolio
+        quantity = portfolio.TRADE_QUANTITY
+        signal_codes = np.where(signals_arr == 'LONG', 1, np.where(signals_arr == 'SHORT', -1, 0)).astype(np.int8)
+
+        (cash_curve, lots_curve, event_idx, event_type, event_price,
+         open_idx, open_sign, open_entry, capital, lots) = simulate(
+            np.asarray(close_arr, dtype=np.float64),
+            signal_codes,
+            float(quantity),
+            Trade.stop_loss,
+            Trade.take_profit,
+            float(portfolio.current_capital))
+
+        portfolio.record_transactions(
+            list(ts_arr[event_idx]),
+            [EVENT_TYPES[code] for code in event_type.tolist()],
+            asset_symbol,
+            quantity,
+            event_price.tolist())
+
+        for idx, sign, price in zip(open_idx.tolist(), open_sign.tolist(), open_entry.tolist()):
+            portfolio.register_open_trade(Trade(
+                timestamp=ts_arr[idx],
+                type='LONG' if sign == 1 else 'SHORT',
+                asset=asset_symbol,
+                quantity=quantity,
+                entry_price=price,
+                is_open=True))
+
+        portfolio.current_capital = float(capital)
+        if len(event_idx):
+            portfolio.adjust_position(asset_symbol, int(lots) * quantity)
+        portfolio.record_equity(cash_curve + (lots_curve * quantity) * close_arr, index)
+
     def get_results(self):
         """
         Returns the final results of the backtest.
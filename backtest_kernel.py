@@ -0,0 +1,135 @@
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - numba is optional
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Identity decorator used when numba is not installed."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
+
+# Event codes written to the trade table (index into EVENT_TYPES)
+EVENT_TYPES = ('LONG', 'SHORT', 'TP', 'SL')
+LONG, SHORT, TP, SL = 0, 1, 2, 3
+
+
+@njit(cache=True)
+def simulate(close, signals, quantity, stop_loss, take_profit, initial_capital):
+    """
+    Runs the Portfolio logic of BacktestEngine.run_backtest as a compiled loop
+    over NumPy arrays for a single asset.
+
+    Per bar the order is the same as the Portfolio path: TP/SL check on the
+    open trades, then the signal (LONG needs enough capital, SHORT is always
+    executed) and finally the capital and net position of the bar, from which
+    the caller builds the equity curve in one vectorized expression. Open
+    trades are kept as parallel arrays in the same order as Portfolio.trades.
+
+    Args:
+        close (np.ndarray): float64 close prices.
+        signals (np.ndarray): int8 signals (1 = LONG, -1 = SHORT, 0 = HOLD).
+        quantity (float): Units traded per signal.
+        stop_loss (float): Stop loss as a fraction of the entry price.
+        take_profit (float): Take profit as a fraction of the entry price.
+        initial_capital (float): Starting capital.
+
+    Returns:
+        tuple: (cash_curve, lots_curve, event_idx, event_type, event_price,
+        open_idx, open_sign, open_entry, capital, lots). cash_curve and
+        lots_curve are the capital and net position (in units of quantity)
+        after each bar; events are the transactions in order; the open_*
+        arrays describe the trades still open at the end.
+    """
+    n = close.shape[0]
+    cash_curve = np.empty(n, dtype=np.float64)
+    lots_curve = np.empty(n, dtype=np.int64)
+
+    # Every trade is opened once and closed at most once
+    event_idx = np.empty(2 * n, dtype=np.int64)
+    event_type = np.empty(2 * n, dtype=np.int8)
+    event_price = np.empty(2 * n, dtype=np.float64)
+    n_events = 0
+
+    open_idx = np.empty(n, dtype=np.int64)
+    open_sign = np.empty(n, dtype=np.int8)
+    open_entry = np.empty(n, dtype=np.float64)
+    open_inv_entry = np.empty(n, dtype=np.float64)
+    n_open = 0
+
+    capital = initial_capital
+    lots = 0
+
+    for i in range(n):
+        price = close[i]
+
+        # 1) TP/SL on every open trade, compacting the survivors in place
+        write = 0
+        for read in range(n_open):
+            entry = open_entry[read]
+            inv_entry = open_inv_entry[read]
+            sign = open_sign[read]
+            pnl = sign * (price - entry) * inv_entry
+            if pnl >= take_profit or pnl <= -stop_loss:
+                lots -= sign
+                capital += sign * quantity * price
+                event_idx[n_events] = i
+                event_type[n_events] = TP if pnl >= take_profit else SL
+                event_price[n_events] = price
+                n_events += 1
+            else:
+                open_idx[write] = open_idx[read]
+                open_sign[write] = sign
+                open_entry[write] = entry
+                open_inv_entry[write] = inv_entry
+                write += 1
+        n_open = write
+
+        # 2) Signal
+        signal = signals[i]
+        if signal != 0:
+            cost = quantity * price
+            opened = False
+            if signal == 1 and capital >= cost:
+                capital -= cost
+                lots += 1
+                opened = True
+            elif signal == -1:
+                capital += cost
+                lots -= 1
+                opened = True
+            if opened:
+                open_idx[n_open] = i
+                open_sign[n_open] = signal
+                open_entry[n_open] = price
+                open_inv_entry[n_open] = 1.0 / price
+                n_open += 1
+                event_idx[n_events] = i
+                event_type[n_events] = LONG if signal == 1 else SHORT
+                event_price[n_events] = price
+                n_events += 1
+
+        # 3) State for the equity curve
+        cash_curve[i] = capital
+        lots_curve[i] = lots
+
+    return (
+        cash_curve,
+        lots_curve,
+        event_idx[:n_events],
+        event_type[:n_events],
+        event_price[:n_events],
+        open_idx[:n_open],
+        open_sign[:n_open],
+        open_entry[:n_open],
+        capital,
+        lots,
+    )
+
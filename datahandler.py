@@ -1,7 +1,21 @@
+import numpy as np
 import pandas as pd
 import yfinance as yf
+import datetime as dt
+import json
 import os
 
+def _downcast_close(frame):
+    """
+    Stores Close as float32 (prices carry far fewer significant digits than
+    float64 holds): half the memory and bandwidth for the indicator scans.
+    Consumers upcast to float64 wherever values accumulate (equity, cash).
+    """
+    if 'Close' in frame.columns:
+        frame['Close'] = frame['Close'].astype(np.float32)
+    return frame
+
+
 class Datahandler:
 
     def __init__(self, start_date='str', end_date='str', asset_symbol='str'):
@@ -16,9 +30,18 @@ class Datahandler:
         if not os.path.exists(db_dir):
             os.makedirs(db_dir)
 
+        # Parquet is the primary cache (typed, compressed, fast to read); the CSV
+        # copy is kept for human inspection and as a fallback for older caches
+        parquet_path = os.path.join(db_dir, f"{path}.parquet") if path else None
         csv_path = os.path.join(db_dir, f"{path}.csv") if path else None
+        # Sidecar with the ticker and date range the cache was downloaded for
+        meta_path = os.path.join(db_dir, f"{path}.json") if path else None
 
-        if source == "yahoo":
+        if source == "yahoo" and self._cache_is_fresh(parquet_path, meta_path):
+            # Same request already on disk and still current: skip the network call
+            self.data = pd.read_parquet(parquet_path, engine='pyarrow')
+            print(f"Data loaded from {parquet_path} (cache is up to date).")
+        elif source == "yahoo":
             print(f"Loading data for {self.asset_symbol} from {self.start_date} to {self.end_date}")
             self.data = yf.download(
                 tickers=self.asset_symbol,
@@ -30,13 +53,19 @@ class Datahandler:
                 print("No data found for the specified asset or data range")
                 # self.data.columns = self.data.droplevel(1)
             print(self.data.head())
-            if csv_path:
+            if parquet_path:
+                self.data.to_parquet(parquet_path, engine='pyarrow')
                 self.data.to_csv(csv_path)
-                print(f"Data saved to {csv_path}.")
+                with open(meta_path, 'w') as f:
+                    json.dump({'ticker': self.asset_symbol, 'start': self.start_date, 'end': self.end_date}, f)
+                print(f"Data saved to {parquet_path} (CSV copy at {csv_path}).")
             else:
-                print("Warning: No file name provided. Data not saved to CSV.")
+                print("Warning: No file name provided. Data not saved to disk.")
         elif source == 'csv':
-            if csv_path:
+            if parquet_path and os.path.exists(parquet_path):
+                self.data = pd.read_parquet(parquet_path, engine='pyarrow')
+                print(f"Data loaded from {parquet_path}.")
+            elif csv_path:
                 try:
                     self.data = pd.read_csv(csv_path, skiprows=2, index_col='Date', parse_dates=True)
                     print(f"Data loaded from {csv_path}.")
@@ -52,8 +81,66 @@ class Datahandler:
         else:
             print("Error: Unsupported data source. Use 'yahoo' or 'csv'.")
 
+        # Convert the index once here; downstream code (engine, analyzer, mplfinance)
+        # shares this frame by reference and relies on a DatetimeIndex
+        if not isinstance(self.data.index, pd.DatetimeIndex):
+            self.data.index = pd.DatetimeIndex(self.data.index)
+        _downcast_close(self.data)
+
         #IMPROVING AREA: DOING ERROR HANDLING FOR DATA LIMITATIONS AND DOING ALERTS
 
+    def _cache_is_fresh(self, parquet_path, meta_path):
+        """
+        True if the Parquet cache was downloaded for this ticker and date range
+        and cannot have changed since: the range ended before the day the file
+        was written, or the file was written today.
+        """
+        if not parquet_path or not os.path.exists(parquet_path) or not os.path.exists(meta_path):
+            return False
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            end_date = pd.Timestamp(self.end_date).date()
+        except (OSError, ValueError):
+            return False
+        if meta != {'ticker': self.asset_symbol, 'start': self.start_date, 'end': self.end_date}:
+            return False
+        written = dt.date.fromtimestamp(os.stat(parquet_path).st_mtime)
+        return end_date < written or written >= dt.date.today()
+
+    @staticmethod
+    def download_many(asset_symbols, start_date, end_date) -> dict:
+        """
+        Downloads several symbols with a single yf.download call (one request,
+        threaded) and splits the result into one DataFrame per symbol.
+
+        Returns:
+            dict: symbol -> DataFrame with the same columns as load_data; empty
+            for symbols Yahoo returned nothing for.
+        """
+        asset_symbols = list(asset_symbols)
+        print(f"Loading data for {', '.join(asset_symbols)} from {start_date} to {end_date}")
+        bulk = yf.download(
+            tickers=asset_symbols,
+            start=start_date,
+            end=end_date,
+            group_by='ticker',
+            threads=True,
+            progress=False)
+
+        frames = {}
+        available = set(bulk.columns.get_level_values(0)) if isinstance(bulk.columns, pd.MultiIndex) else set()
+        for symbol in asset_symbols:
+            if symbol not in available:
+                print(f"No data found for {symbol} in the specified data range")
+                frames[symbol] = pd.DataFrame()
+                continue
+            # The bulk index is the union of all symbols' dates: drop the ones this symbol lacks
+            frame = bulk.xs(symbol, axis=1, level=0).dropna(how='all')
+            frame.columns.name = None
+            frames[symbol] = _downcast_close(frame)
+        return frames
+
     def get_latest_data(self, n=1):
         if not self.data.empty:
             return self.data.tail(n)
@@ -1,14 +1,106 @@
+import numpy as np
 import pandas as pd
+from backtest_kernel import NUMBA_AVAILABLE, njit
 from strategy import Strategy
 
+# Signal labels by kernel code: 0 = HOLD, 1 = LONG, -1 (last) = SHORT
+SIGNAL_LABELS = np.array(['HOLD', 'LONG', 'SHORT'], dtype=object)
+
+
+@njit(cache=True)
+def ema_cross_kernel(close, alpha_short, alpha_long):
+    """
+    Both EMAs (ewm(adjust=False).mean() arithmetic) and the crossover check
+    fused in one pass over close, without intermediate arrays.
+
+    Args:
+        close (np.ndarray): float64 close prices without NaN.
+        alpha_short (float): Smoothing factor of the short EMA.
+        alpha_long (float): Smoothing factor of the long EMA.
+
+    Returns:
+        np.ndarray: int8 signals (1 = LONG, -1 = SHORT, 0 = HOLD).
+    """
+    n = close.shape[0]
+    out = np.zeros(n, dtype=np.int8)
+    if n == 0:
+        return out
+    old_short = 1.0 - alpha_short
+    old_long = 1.0 - alpha_long
+    s = close[0]
+    l = close[0]
+    for i in range(1, n):
+        price = close[i]
+        s_new = s if s == price else (old_short * s + alpha_short * price) / (old_short + alpha_short)
+        l_new = l if l == price else (old_long * l + alpha_long * price) / (old_long + alpha_long)
+        if s <= l and s_new > l_new:
+            out[i] = 1
+        elif s >= l and s_new < l_new:
+            out[i] = -1
+        s = s_new
+        l = l_new
+    return out
+
 class EMACrossoverStrategy(Strategy):
     """
     A strategy that generates signals based on an Exponential Moving Average (EMA) crossover.
+
+    Every EMA here uses ewm(adjust=False), the recursive form
+    ema_t = alpha * price_t + (1 - alpha) * ema_{t-1}. The incremental state of
+    generate_signals and ema_cross_kernel rely on it; the default adjust=True
+    weighted average cannot be updated one bar at a time.
     """
     def __init__(self, asset_symbol, short_window=2, long_window=5):
         super().__init__(asset_symbol)
         self.short_window = short_window
         self.long_window = long_window
+        # Smoothing factors as computed by pandas ewm(span=...)
+        self._alpha_short = 1.0 / (1.0 + (short_window - 1) / 2)
+        self._alpha_long = 1.0 / (1.0 + (long_window - 1) / 2)
+        # Incremental EMA state of generate_signals: latest and previous values
+        self.reset()
+
+    def reset(self):
+        """
+        Forgets the incremental EMA state: the next generate_signals call
+        recomputes the EMAs from the full history it is given.
+        """
+        self._bars_seen = 0
+        self._ema_exact = True
+        self._short_ema = self._long_ema = np.nan
+        self._previous_short_ema = self._previous_long_ema = np.nan
+        # Identity of the series the state belongs to: first timestamp, and
+        # timestamp and price of the last bar seen
+        self._first_ts = self._last_ts = None
+        self._last_price = np.nan
+
+    @staticmethod
+    def _ema_step(previous_ema, price, alpha):
+        """
+        One ewm(adjust=False).mean() update for an observed price, with the same
+        arithmetic as pandas so the values are identical.
+        """
+        if previous_ema != previous_ema:
+            return price
+        if previous_ema == price:
+            return previous_ema
+        old_wt = 1.0 - alpha
+        return (old_wt * previous_ema + alpha * price) / (old_wt + alpha)
+
+    def _rebuild_ema_state(self, close):
+        """
+        Recomputes the EMA state from the full close history.
+        """
+        short_ema = close.ewm(span=self.short_window, adjust=False).mean().to_numpy()
+        long_ema = close.ewm(span=self.long_window, adjust=False).mean().to_numpy()
+        n = len(close)
+        self._short_ema = short_ema[-1] if n > 0 else np.nan
+        self._long_ema = long_ema[-1] if n > 0 else np.nan
+        self._previous_short_ema = short_ema[-2] if n > 1 else np.nan
+        self._previous_long_ema = long_ema[-2] if n > 1 else np.nan
+        self._bars_seen = n
+        # pandas reweights after missing prices; keep recomputing in that case
+        self._ema_exact = not close.isna().any()
 
     def generate_signals(self, data):
         """
@@ -16,20 +108,40 @@ class EMACrossoverStrategy(Strategy):
 
         A 'LONG' signal is generated when the short EMA crosses above the long EMA.
         A 'SHORT' signal is generated when the short EMA crosses below the long EMA.
+
+        When data extends the series of the previous call by exactly one bar
+        (same first timestamp, and its second-to-last bar is the last bar seen,
+        same timestamp and price), the EMAs are updated in O(1); any other
+        input recomputes them from the full history. Edits to earlier bars of
+        the same frame are not detected: call reset() after changing it.
         """
-        if len(data) < self.long_window:
-            return 'HOLD'
+        close = data['Close']
+        n = len(close)
+        # float() so a float32 Close is updated in float64, like pandas ewm
+        price = float(close.iat[-1]) if n > 0 else np.nan
+        index = close.index
+        if (n == self._bars_seen + 1 and n > 1 and self._ema_exact and price == price
+                and index[0] == self._first_ts and index[-2] == self._last_ts
+                and float(close.iat[-2]) == self._last_price):
+            self._previous_short_ema = self._short_ema
+            self._previous_long_ema = self._long_ema
+            self._short_ema = self._ema_step(self._short_ema, price, self._alpha_short)
+            self._long_ema = self._ema_step(self._long_ema, price, self._alpha_long)
+            self._bars_seen = n
+        else:
+            self._rebuild_ema_state(close)
+        if n > 0:
+            self._first_ts, self._last_ts, self._last_price = index[0], index[-1], price
 
-        # Calculate the short and long EMAs
-        short_ema = data['Close'].ewm(span=self.short_window, adjust=False).mean()
-        long_ema = data['Close'].ewm(span=self.long_window, adjust=False).mean()
+        if n < self.long_window:
+            return 'HOLD'
 
-        # Get the latest EMA values
-        latest_short_ema = short_ema.iloc[-1]
-        latest_long_ema = long_ema.iloc[-1]
+        # Get the latest and previous EMA values
+        latest_short_ema = self._short_ema
+        latest_long_ema = self._long_ema
 
-        previous_short_ema = short_ema.iloc[-2]
-        previous_long_ema = long_ema.iloc[-2]
+        previous_short_ema = self._previous_short_ema
+        previous_long_ema = self._previous_long_ema
 
         # Check for a crossover
         if previous_short_ema <= previous_long_ema and latest_short_ema > latest_long_ema:
@@ -38,3 +150,35 @@ class EMACrossoverStrategy(Strategy):
             return 'SHORT'
         else:
             return 'HOLD'
+
+    def generate_signals_vectorized(self, data):
+        """
+        Generates the signal of every bar at once; matches generate_signals on each prefix.
+
+        With numba, ema_cross_kernel computes both EMAs and the crossovers in one
+        compiled pass. Otherwise both EMAs are computed once over the full close
+        series and the crossovers are found by comparing the NumPy arrays with
+        themselves shifted one bar.
+        """
+        close = data['Close']
+        close_arr = close.to_numpy(dtype=np.float64)
+        if NUMBA_AVAILABLE and not np.isnan(close_arr).any():
+            # Compiled single pass; missing prices keep the pandas path
+            signals = SIGNAL_LABELS[ema_cross_kernel(close_arr, self._alpha_short, self._alpha_long)]
+            signals[:self.long_window - 1] = 'HOLD'
+            return pd.Series(signals, index=data.index)
+
+        short_ema = close.ewm(span=self.short_window, adjust=False).mean().to_numpy()
+        long_ema = close.ewm(span=self.long_window, adjust=False).mean().to_numpy()
+
+        signals = np.full(len(close), 'HOLD', dtype=object)
+        previous_short_ema, latest_short_ema = short_ema[:-1], short_ema[1:]
+        previous_long_ema, latest_long_ema = long_ema[:-1], long_ema[1:]
+        long_cross = (previous_short_ema <= previous_long_ema) & (latest_short_ema > latest_long_ema)
+        short_cross = (previous_short_ema >= previous_long_ema) & (latest_short_ema < latest_long_ema)
+        # Crossovers found on the pair (i-1, i) belong to bar i
+        signals[1:][long_cross] = 'LONG'
+        signals[1:][short_cross] = 'SHORT'
+        # Not enough bars yet for the long window
+        signals[:self.long_window - 1] = 'HOLD'
+        return pd.Series(signals, index=data.index)
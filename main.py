@@ -25,7 +25,7 @@ def main():
     AAPL = Datahandler
     #sma = SMACrossoverStrategy(AAPL, 4, 10)
     ema = EMACrossoverStrategy(AAPL, 4, 10)
-    portfolio = Portfolio(100000)
+    portfolio = Portfolio(100000, n_bars=len(data_AAPL.get_all_data()))
     backtest = BacktestEngine(data_AAPL, ema, portfolio)
     backtest.run_backtest()
     backtest.get_results()
@@ -33,7 +33,6 @@ def main():
     #print(portfolio.equity_curve)
     portfolio.get_current_holdings()
     portfolio.get_results()
-    performance.calculate_metrics()
     metrics = performance.calculate_metrics()
     for key, value in metrics.items():
         print(f"{key}: {value}")
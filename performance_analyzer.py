@@ -5,6 +5,51 @@ import matplotlib.dates as mdates
 import seaborn as sns
 import mplfinance as mpf
 from portfolio import Portfolio
+from backtest_kernel import NUMBA_AVAILABLE, njit
+
+
+@njit(cache=True, error_model='numpy')
+def _max_drawdown_loop(values):
+    """
+    Maximum drawdown of an equity curve in one pass: the running peak and the
+    lowest (value - peak) / peak are tracked together, without the cummax and
+    drawdown temporaries. NaN values are skipped, as np.fmax.accumulate and
+    np.nanmin do.
+
+    Args:
+        values (np.ndarray): float64 equity values.
+
+    Returns:
+        float: The most negative drawdown ratio (NaN if there is none).
+    """
+    peak = np.nan
+    min_ratio = np.nan
+    for i in range(values.shape[0]):
+        value = values[i]
+        if np.isnan(value):
+            continue
+        if np.isnan(peak) or value > peak:
+            peak = value
+        ratio = (value - peak) / peak
+        if np.isnan(min_ratio) or ratio < min_ratio:
+            min_ratio = ratio
+    return min_ratio
+
+
+def _max_drawdown_numpy(values):
+    """
+    Same result as _max_drawdown_loop with NumPy array operations, used when
+    numba is not installed (a plain Python loop would be slower).
+    """
+    if not (values == values).any():
+        return np.nan
+    rolling_max = np.fmax.accumulate(values)
+    return np.nanmin((values - rolling_max) / rolling_max)
+
+
+# The compiled loop, or the NumPy version when it would run as plain Python
+max_drawdown = _max_drawdown_loop if NUMBA_AVAILABLE else _max_drawdown_numpy
+
 
 class PerformanceAnalyzer:
     """
@@ -26,14 +71,8 @@ class PerformanceAnalyzer:
         self.transactions.set_index('timestamp', inplace=True)
         self.equity_curve = equity_data
         self.data = data
-
-        # Ensure the data has a DatetimeIndex for mplfinance
-        if not isinstance(self.data.index, pd.DatetimeIndex):
-            self.data.index = pd.to_datetime(self.data.index)
-        
-        # # Ensure the transactions DataFrame has a DatetimeIndex
-        # if not self.transactions.empty:
-        #     self.transactions.index = pd.to_datetime(self.transactions['timestamp'])
+        # Metrics of this (fixed) equity curve, computed on first request
+        self._metrics = None
 
         print("\nDebug info for PerformanceAnalyzer:")
         print(f"Equity curve received: \n{self.equity_curve.head()}")
@@ -46,12 +85,15 @@ class PerformanceAnalyzer:
         Returns:
             dict: A dictionary containing the calculated metrics.
         """
+        if self._metrics is not None:
+            return self._metrics
+
         if self.equity_curve.empty or len(self.equity_curve) < 2:
             print("Not enough data to calculate metrics.")
             return {}
 
         initial_capital = self.portfolio.initial_capital
-        final_equity = self.equity_curve.iloc[-1]
+        final_equity = self.equity_curve.to_numpy()[-1]
         
         # Total Return
         total_return = (final_equity - initial_capital) / initial_capital
@@ -60,30 +102,33 @@ class PerformanceAnalyzer:
         num_days = len(self.equity_curve)
         annualized_return = ((1 + total_return) ** (252 / num_days)) - 1 if num_days > 0 else 0
 
-        # Drawdown and Max Drawdown
-        equity_series = pd.Series(self.equity_curve)
-        rolling_max = equity_series.cummax()
-        drawdown = (equity_series - rolling_max) / rolling_max
-        max_drawdown = drawdown.min()
+        # Max Drawdown in a single pass over the NumPy values (running peak and ratio)
+        equity_values = self.equity_curve.to_numpy(dtype=np.float64)
+        max_drawdown_ratio = max_drawdown(equity_values)
         
         # Use S&P 500 annualized return as risk-free rate (approx. 8% historically)
         risk_free_rate = 0.04 / 252  # daily risk-free rate
 
-        # Sharpe Ratio calculation
-        daily_returns = self.equity_curve.pct_change().dropna()
-        excess_daily_returns = daily_returns - risk_free_rate
-        sharpe_ratio = np.sqrt(252) * excess_daily_returns.mean() / excess_daily_returns.std() if excess_daily_returns.std() != 0 else 0
+        # Sharpe Ratio calculation on the NumPy values (same as pct_change().dropna(), std with ddof=1)
+        daily_returns = equity_values[1:] / equity_values[:-1] - 1.0
+        excess_daily_returns = daily_returns[~np.isnan(daily_returns)] - risk_free_rate
+        if excess_daily_returns.size < 2:
+            sharpe_ratio = np.nan
+        else:
+            excess_std = excess_daily_returns.std(ddof=1)
+            sharpe_ratio = np.sqrt(252) * excess_daily_returns.mean() / excess_std if excess_std != 0 else 0
         risk_free_win = 0.04 * initial_capital
         
-        return {
+        self._metrics = {
             "Initial Capital": initial_capital,
             "Final Equity": final_equity,
             "Total Return (%)": total_return * 100,
             "Annualized Return (%)": annualized_return * 100,
-            "Max Drawdown (%)": max_drawdown * 100,
+            "Max Drawdown (%)": max_drawdown_ratio * 100,
             "Sharpe Ratio": sharpe_ratio,
             "Risk free win": risk_free_win
         }
+        return self._metrics
 
     def plot_results(self):
         """
@@ -115,15 +160,11 @@ class PerformanceAnalyzer:
             # SHORT entries: include both 'SHORT' and 'SL' (Stop Loss)
             short_entries = self.transactions[self.transactions['type'].isin(['SHORT', 'SL'])]
 
-            long_markers = [np.nan] * len(self.data)
-            for i in range(len(self.data.index)):
-                if self.data.index[i] in long_entries.index:
-                    long_markers[i] = self.data['Low'].iloc[i] * 0.99
-
-            short_markers = [np.nan] * len(self.data)
-            for i in range(len(self.data.index)):
-                if self.data.index[i] in short_entries.index:
-                    short_markers[i] = self.data['High'].iloc[i] * 1.01
+            # Marker below/above each bar with an entry, NaN elsewhere (one vectorized pass each)
+            long_markers = np.where(self.data.index.isin(long_entries.index),
+                                    self.data['Low'].to_numpy() * 0.99, np.nan)
+            short_markers = np.where(self.data.index.isin(short_entries.index),
+                                     self.data['High'].to_numpy() * 1.01, np.nan)
 
             add_plots.append(mpf.make_addplot(long_markers, type='scatter', marker='^', markersize=100, color='green', label='LONG Entry'))
             add_plots.append(mpf.make_addplot(short_markers, type='scatter', marker='v', markersize=100, color='red', label='SHORT Entry'))
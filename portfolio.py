@@ -1,47 +1,173 @@
+import logging
+import numpy as np
 import pandas as pd
+from backtest_kernel import NUMBA_AVAILABLE, njit
 from transactions import Transaction
 from trade import Trade
 
+logger = logging.getLogger(__name__)
+
+
+@njit(cache=True, error_model='numpy')
+def _scan_trades(entry, inv_entry, sign, take_profit, stop_loss, asset_idx, prices, out_closed_mask, out_pnl):
+    """
+    TP/SL check of the open trades (parallel arrays, in Portfolio.trades order)
+    at the current prices, indexed by asset id. Writes the pnl of every trade
+    to out_pnl and whether it closes to out_closed_mask.
+    """
+    for i in range(entry.shape[0]):
+        pnl = sign[i] * (prices[asset_idx[i]] - entry[i]) * inv_entry[i]
+        out_pnl[i] = pnl
+        out_closed_mask[i] = pnl >= take_profit[i] or pnl <= -stop_loss[i]
+
+
+def _scan_trades_numpy(entry, inv_entry, sign, take_profit, stop_loss, asset_idx, prices, out_closed_mask, out_pnl):
+    """
+    Same scan as _scan_trades in a few vectorized NumPy operations, used when
+    numba is not installed.
+    """
+    pnl = sign * (prices[asset_idx] - entry) * inv_entry
+    out_closed_mask[:] = (pnl >= take_profit) | (pnl <= -stop_loss)
+    out_pnl[:] = pnl
+
+
 class Portfolio:
     """
     Manages the capital, positions, and transaction history for the backtest.
     """
-    def __init__(self, initial_capital=100000.0):
+    TRADE_QUANTITY = 150  # SIMPLIFIED: fixed units per signal
+    TRADE_CAPACITY = 1024  # Initial size of the open-trade arrays
+    ASSET_CAPACITY = 16  # Initial size of the per-asset arrays
+    # Parallel open-trade arrays, grown and compacted together
+    _TRADE_ARRAYS = ('_t_entry', '_t_inv_entry', '_t_sign', '_t_tp', '_t_sl', '_t_asset_idx')
+
+    def __init__(self, initial_capital=100000.0, verbose=False, n_bars=0):
         
         self.initial_capital = initial_capital
+        # Log every executed order, TP and SL included (logger level DEBUG); off by default for speed
+        self.verbose = verbose
         self.current_capital = initial_capital
-        self.positions = {}  #Dictionary to hold the quantity of each asset
-        self.transactions = []  # List to record all transaction details
+        # Transaction log as parallel columns (one list per Transaction field)
+        self._tx = {'timestamp': [], 'type': [], 'asset': [], 'quantity': [], 'price': []}
         self.trades = []
+        # Assets get a small integer id (register_asset) when first traded; the
+        # quantity held of each one is _pos[id]. Like the trade arrays, the
+        # per-asset arrays have spare capacity (doubled when full); only the
+        # first len(_asset_symbols) entries are in use
+        self._asset_ids = {}
+        self._asset_symbols = []
+        self._pos = np.zeros(self.ASSET_CAPACITY, dtype=np.float64)
+        # Number of open trades of each asset id, to skip assets with none
+        self._open_per_asset = np.zeros(self.ASSET_CAPACITY, dtype=np.int64)
+        # Open trades again as parallel arrays, in the same order as self.trades,
+        # for the TP/SL scans. The arrays have spare capacity (doubled when
+        # full); only the first _t_n entries are in use
+        self._t_n = 0
+        self._t_entry = np.empty(self.TRADE_CAPACITY, dtype=np.float64)
+        # 1 / entry price, computed once at open: the scans multiply instead of dividing
+        self._t_inv_entry = np.empty(self.TRADE_CAPACITY, dtype=np.float64)
+        self._t_sign = np.empty(self.TRADE_CAPACITY, dtype=np.float64)
+        self._t_tp = np.empty(self.TRADE_CAPACITY, dtype=np.float64)
+        self._t_sl = np.empty(self.TRADE_CAPACITY, dtype=np.float64)
+        self._t_asset_idx = np.empty(self.TRADE_CAPACITY, dtype=np.int64)
+        # Equity points of calculate_equity, written at a cursor into arrays
+        # preallocated for n_bars bars (grown if more are recorded) and merged
+        # into the equity_curve Series only when it is read
+        self._eq_vals = np.empty(n_bars, dtype=np.float64)
+        self._eq_ts = np.empty(n_bars, dtype='datetime64[ns]')
+        self._eq_i = 0
         self.equity_curve = pd.Series(dtype=float) #List to track portfolio value over time
 
-    def handle_signal(self, signal, timestamp, asset_symbol, price, all_prices):
-        trade_quantity = 150 #SIMPLIFIED
+    @property
+    def positions(self):
+        """
+        Quantity held of each traded asset, as a new dict symbol -> quantity.
+
+        It is a snapshot: changing it does not change the portfolio (use
+        adjust_position for that).
+        """
+        return dict(zip(self._asset_symbols, self._pos[:len(self._asset_symbols)].tolist()))
+
+    def position(self, asset_symbol):
+        """
+        Quantity held of asset_symbol (0 if it was never traded).
+        """
+        asset_id = self._asset_ids.get(asset_symbol)
+        return 0 if asset_id is None else float(self._pos[asset_id])
+
+    def adjust_position(self, asset_symbol, quantity):
+        """
+        Adds quantity (negative to reduce) to the position held of asset_symbol.
+        """
+        asset_id = self.register_asset(asset_symbol)
+        self._pos[asset_id] += quantity
+
+    def register_asset(self, asset_symbol):
+        """
+        Returns the integer id of asset_symbol, assigning the next free one (with
+        a zero position) on first use. Price arrays passed to check_TP_SL and
+        calculate_equity are indexed by these ids.
+        """
+        # setdefault: a single hash of the symbol whether it is new or not
+        asset_id = self._asset_ids.setdefault(asset_symbol, len(self._asset_symbols))
+        if asset_id == len(self._asset_symbols):
+            self._asset_symbols.append(asset_symbol)
+            if asset_id == len(self._pos):
+                # Full: double the capacity, new entries start at zero
+                self._pos = np.concatenate((self._pos, np.zeros_like(self._pos)))
+                self._open_per_asset = np.concatenate((self._open_per_asset, np.zeros_like(self._open_per_asset)))
+        return asset_id
+
+    @property
+    def transactions(self):
+        """
+        All transaction details recorded so far, as Transaction records.
+        """
+        return [Transaction(*row) for row in zip(*self._tx.values())]
+
+    @property
+    def equity_curve(self):
+        """
+        Portfolio value over time (pd.Series indexed by timestamp).
+        """
+        if self._eq_i:
+            n, self._eq_i = self._eq_i, 0
+            self._merge_equity(self._equity_curve, self._eq_vals[:n].copy(), pd.DatetimeIndex(self._eq_ts[:n]))
+        return self._equity_curve
+
+    @equity_curve.setter
+    def equity_curve(self, series):
+        self._eq_i = 0
+        self._equity_curve = series
+
+    def handle_signal(self, signal, timestamp, asset_symbol, price, all_prices, record_equity=True):
+        trade_quantity = self.TRADE_QUANTITY
         quantity = trade_quantity  # Ensure quantity is always defined
 
+        # Trade value (AREA IMPROVEMENT -> ADD COMISSION MARKET MAKER): cost of a
+        # LONG, proceeds of a SHORT
+        cost = trade_quantity * price
+
         if signal == 'LONG':
-            long_trade = Trade(
-                timestamp=timestamp,
-                type='LONG',
-                asset=asset_symbol,
-                quantity=trade_quantity,
-                entry_price=price)
-            
-            cost = long_trade.cost_trade()
-            quantity = long_trade.quantity
-            
             if self.current_capital >= cost:
-                long_trade.open_trade()
+                long_trade = Trade(
+                    timestamp=timestamp,
+                    type='LONG',
+                    asset=asset_symbol,
+                    quantity=trade_quantity,
+                    entry_price=price,
+                    is_open=True)
                 self._record_transaction(long_trade)
 
-                self.trades.append(long_trade)
+                self.register_open_trade(long_trade)
                 #register cost in current capital and update positions
                 self.current_capital -= cost
-                self.positions[asset_symbol] = self.positions.get(asset_symbol, 0) + quantity
+                self.adjust_position(asset_symbol, quantity)
 
-                print(f"[{timestamp}] Executed LONG order for {quantity} units of {asset_symbol} at {price:.2f}.")
-            else:
-                print(f"[{timestamp}] Insufficient funds to go long on {quantity} units of {asset_symbol}.")
+                if self.verbose and logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("[%s] Executed LONG order for %s units of %s at %.2f.", timestamp, quantity, asset_symbol, price)
+            elif self.verbose and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[%s] Insufficient funds to go long on %s units of %s.", timestamp, quantity, asset_symbol)
 
         elif signal == 'SHORT':
             short_trade = Trade(
@@ -49,104 +175,247 @@ class Portfolio:
                 type='SHORT',
                 asset=asset_symbol,
                 quantity=trade_quantity,
-                entry_price=price)
-            
-            revenue = short_trade.cost_trade()  # Assuming cost_trade returns the proceeds for SHORT
-
-            short_trade.open_trade()
-            quantity = short_trade.quantity
-            self.trades.append(short_trade)
+                entry_price=price,
+                is_open=True)
+            self.register_open_trade(short_trade)
             # Register revenue in current capital and update positions
-            self.current_capital += revenue
-            self.positions[asset_symbol] = self.positions.get(asset_symbol, 0) - quantity
+            self.current_capital += cost
+            self.adjust_position(asset_symbol, -quantity)
 
             self._record_transaction(short_trade)
-            print(f"[{timestamp}] Executed SHORT order for {quantity} units of {asset_symbol} at {price:.2f}.")
-        self.calculate_equity(all_prices, timestamp)
+            if self.verbose and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[%s] Executed SHORT order for %s units of %s at %.2f.", timestamp, quantity, asset_symbol, price)
+        if record_equity:
+            self.calculate_equity(all_prices, timestamp)
 
-    def check_TP_SL(self, current_prices, timestamp): #ADD TRANSACTION AND MANAGE TP and SL TRADES
-        for trade in self.trades:  # iterate over a copy
-            price = current_prices[trade.asset]
+    def check_TP_SL(self, current_prices, timestamp, record_equity=False): #ADD TRANSACTION AND MANAGE TP and SL TRADES
+        """
+        Closes the open trades that reach their take profit or stop loss.
+
+        Args:
+            current_prices (dict or np.ndarray): Latest price by asset symbol, or
+                an array of the prices by asset id (see register_asset).
+            record_equity (bool): Also record the equity of the bar after the closes,
+                valuing the positions with the same price array (assets without a
+                price are not valued) instead of a separate calculate_equity call.
+        """
+        if not self.trades and not record_equity:
+            return
+        if isinstance(current_prices, dict):
+            # Prices by asset id; assets without a current price cannot close
+            prices = np.array([current_prices.get(symbol, np.nan) for symbol in self._asset_symbols], dtype=np.float64)
+        else:
+            prices = np.asarray(current_prices, dtype=np.float64)
+        priced = ~np.isnan(prices)
+        n_assets = len(self._asset_symbols)
+        # Only trades of assets with a price can close: nothing to do if none is open
+        if self._open_per_asset[:n_assets][priced].any():
+            self._close_hits(prices, timestamp)
+        if record_equity:
+            self._append_equity(self.current_capital + float(self._pos[:n_assets] @ np.where(priced, prices, 0.0)), timestamp)
+
+    def _close_hits(self, prices, timestamp):
+        """
+        Closes the open trades that hit TP/SL at prices (array by asset id).
+        """
+        n_open = self._t_n
+        closed = np.empty(n_open, dtype=np.bool_)
+        pnls = np.empty(n_open, dtype=np.float64)
+        # The compiled loop, or the NumPy version when it would run as plain Python
+        scan = _scan_trades if NUMBA_AVAILABLE else _scan_trades_numpy
+        scan(*self._open_trade_arrays(), prices, closed, pnls)
+        if not closed.any():
+            return
+
+        # One pass: close the trades that hit TP/SL and move the others forward
+        # in place (no list.remove, every trade is checked exactly once)
+        trades = self.trades
+        write = 0
+        log_orders = self.verbose and logger.isEnabledFor(logging.DEBUG)
+        # Closing transactions go straight into the log columns; all of them
+        # share the bar's timestamp, converted once
+        tx = self._tx
+        tx_timestamp, tx_type, tx_asset, tx_quantity, tx_price = (
+            tx['timestamp'], tx['type'], tx['asset'], tx['quantity'], tx['price'])
+        bar_timestamp = pd.Timestamp(timestamp)
+        for trade, is_closed, pnl in zip(trades, closed.tolist(), pnls.tolist()):
+            if not is_closed:
+                trades[write] = trade
+                write += 1
+                continue
+            asset_id = trade.asset_id
+            price = prices[asset_id]
+            self._open_per_asset[asset_id] -= 1
+            close_type = "TP" if pnl >= trade.take_profit else "SL"
             if trade.type == 'LONG':
-                pnl = (price - trade.entry_price) / trade.entry_price
-                #print("Within long") debugging
-                if pnl >= trade.take_profit or pnl <= -trade.stop_loss:
-                    # Close trade: update positions and capital
-                    self.positions[trade.asset] -= trade.quantity
-                    self.current_capital += trade.quantity * price
-                    self.trades.remove(trade)
-                    # Record closing transaction
-                    close_type = "TP" if pnl >= trade.take_profit else "SL"
-                    print(f"[{timestamp}] Executed {close_type} order from LONG with {pnl:.2f} from ({trade.entry_price:.2f}-{price:.2f})")
-                    
-                    self.transactions.append(
-                        Transaction(
-                        timestamp=timestamp,
-                        type=close_type,
-                        asset=trade.asset,
-                        quantity=trade.quantity,
-                        price=price
-                    ))
-
-            elif trade.type == 'SHORT':
-                #print("Within short")
-                pnl = (trade.entry_price - price) / trade.entry_price
-                
-                if pnl >= trade.take_profit or pnl <= -trade.stop_loss:
-                    self.positions[trade.asset] += trade.quantity
-                    self.current_capital -= trade.quantity * price
-                    self.trades.remove(trade)
-                    close_type = "TP" if pnl >= trade.take_profit else "SL"
-                    print(f"[{timestamp}] Executed {close_type} order from SHORT with {pnl:.2f}% from ({trade.entry_price:.2f}-{price:.2f})")
-                    
-                    self.transactions.append(Transaction(
-                        timestamp=timestamp,
-                        type=close_type,
-                        asset=trade.asset,
-                        quantity=trade.quantity,
-                        price=price
-                    ))
-            
+                # Close trade: update positions and capital
+                self._pos[asset_id] -= trade.quantity
+                self.current_capital += trade.quantity * price
+                if log_orders:
+                    logger.debug("[%s] Executed %s order from LONG with %.2f from (%.2f-%.2f)",
+                                 timestamp, close_type, pnl, trade.entry_price, price)
+            else:
+                self._pos[asset_id] += trade.quantity
+                self.current_capital -= trade.quantity * price
+                if log_orders:
+                    logger.debug("[%s] Executed %s order from SHORT with %.2f%% from (%.2f-%.2f)",
+                                 timestamp, close_type, pnl, trade.entry_price, price)
+            # Record closing transaction
+            tx_timestamp.append(bar_timestamp)
+            tx_type.append(close_type)
+            tx_asset.append(trade.asset)
+            tx_quantity.append(trade.quantity)
+            tx_price.append(price)
+
+        del trades[write:]
+        keep = ~closed
+        for name in self._TRADE_ARRAYS:
+            array = getattr(self, name)
+            array[:write] = array[:n_open][keep]
+        self._t_n = write
+
+    def _open_trade_arrays(self):
+        """
+        Views of the parallel open-trade arrays limited to the trades in use.
+        """
+        n = self._t_n
+        return tuple(getattr(self, name)[:n] for name in self._TRADE_ARRAYS)
+
+    def register_open_trade(self, trade):
+        """
+        Adds an open trade to self.trades and to the arrays of the TP/SL scans.
+        """
+        asset_id = trade.asset_id = self.register_asset(trade.asset)
+        self._open_per_asset[asset_id] += 1
+        self.trades.append(trade)
+        i = self._t_n
+        if i == len(self._t_entry):
+            # Full: double the capacity (amortized O(1) appends)
+            capacity = max(2 * i, 1)
+            for name in self._TRADE_ARRAYS:
+                setattr(self, name, np.resize(getattr(self, name), capacity))
+        self._t_entry[i] = trade.entry_price
+        self._t_inv_entry[i] = 1.0 / trade.entry_price
+        self._t_sign[i] = 1.0 if trade.type == 'LONG' else -1.0
+        self._t_tp[i] = trade.take_profit
+        self._t_sl[i] = trade.stop_loss
+        self._t_asset_idx[i] = asset_id
+        self._t_n = i + 1
+
     def calculate_equity(self, current_prices, timestamp):
         """
         Calculates the current total value of the portfolio.
 
         Args:
-            current_prices (dict): A dictionary mapping asset symbols to their latest prices.
+            current_prices (dict or np.ndarray): A dictionary mapping asset symbols to their
+                latest prices, or an array of the prices by asset id. Assets without
+                a price are not valued.
         """
-        positions_value = 0
-        for asset, qty in self.positions.items():
-            if asset in current_prices:
-                positions_value += qty * current_prices[asset]
+        if isinstance(current_prices, dict):
+            current_prices = np.array([current_prices.get(symbol, 0.0) for symbol in self._asset_symbols], dtype=np.float64)
         
         # Total equity is the sum of current capital and positions value
-        current_equity = self.current_capital + positions_value
-        self.equity_curve.at[timestamp] = current_equity
+        self._append_equity(self.current_capital + float(self._pos[:len(self._asset_symbols)] @ current_prices), timestamp)
+
+    def _append_equity(self, current_equity, timestamp):
+        """
+        Writes one equity point at the cursor of the preallocated arrays.
+        """
+        i = self._eq_i
+        if i == len(self._eq_vals):
+            # More bars than preallocated: double the capacity
+            capacity = max(2 * i, 1)
+            self._eq_vals = np.resize(self._eq_vals, capacity)
+            self._eq_ts = np.resize(self._eq_ts, capacity)
+        self._eq_vals[i] = current_equity
+        self._eq_ts[i] = timestamp
+        self._eq_i = i + 1
     
+    def first_exit_bar(self, asset_symbol, prices):
+        """
+        Returns the index of the first price at which check_TP_SL would close an
+        open trade of asset_symbol, or len(prices) if none would.
+
+        Args:
+            prices (np.ndarray): Consecutive close prices of the asset.
+        """
+        asset_id = self._asset_ids.get(asset_symbol)
+        if asset_id is None or not self._open_per_asset[asset_id] or len(prices) == 0:
+            return len(prices)
+        entry, inv_entry, sign, take_profit, stop_loss, asset_idx = self._open_trade_arrays()
+        mine = asset_idx == asset_id
+
+        # One row per open trade, same pnl arithmetic as check_TP_SL
+        entry = entry[mine][:, None]
+        inv_entry = inv_entry[mine][:, None]
+        sign = sign[mine][:, None]
+        take_profit = take_profit[mine][:, None]
+        stop_loss = stop_loss[mine][:, None]
+
+        pnl = sign * (prices - entry) * inv_entry
+        hit = ((pnl >= take_profit) | (pnl <= -stop_loss)).any(axis=0)
+        return int(hit.argmax()) if hit.any() else len(prices)
+
+    def record_equity(self, values, timestamps):
+        """
+        Records precomputed equity values, one per timestamp, with the same
+        result as setting equity_curve.at[timestamp] for each of them in order.
+
+        Args:
+            values (np.ndarray): float64 equity values, used without a copy.
+            timestamps: One per value. A pd.DatetimeIndex (e.g. the data's index)
+                becomes the curve's index as is, without rebuilding or rehashing it.
+        """
+        if len(values) == 0:
+            return
+        # Reading equity_curve first merges the points pending from calculate_equity
+        self._merge_equity(self.equity_curve, values, timestamps)
+
+    def _merge_equity(self, curve, values, timestamps):
+        """
+        Merges equity values into curve in one operation when both are in
+        increasing timestamp order and the new values come after the curve,
+        falling back to per-timestamp .at otherwise.
+        """
+        index = timestamps if isinstance(timestamps, pd.Index) else pd.Index(timestamps)
+        span = pd.Series(values, index=index, dtype=float, copy=False)
+        index = span.index
+        if index.is_monotonic_increasing and index.is_unique and (
+                curve.empty or (curve.index.is_monotonic_increasing and index[0] > curve.index[-1])):
+            self._equity_curve = span if curve.empty else pd.concat([curve, span])
+        else:
+            for timestamp, value in span.items():
+                curve.at[timestamp] = value
+            self._equity_curve = curve
+
     def _record_transaction(self, trade=Trade):
         """
         Records the details of a transaction in the transactions list.
         This is a helper method, not meant to be called directly from outside the class.
         """
         # Extract transaction details from the Trade object
-        timestamp = trade.timestamp
-        type = trade.type
-        asset_symbol = trade.asset
-        quantity = trade.quantity
-        price = trade.entry_price
+        self.record_transactions([trade.timestamp], [trade.type], trade.asset, trade.quantity, [trade.entry_price])
 
-        new_transaction = Transaction(
-            timestamp=timestamp,
-            type=type,
-            asset=asset_symbol,
-            quantity=quantity,
-            price=price)
+    def record_transactions(self, timestamps, types, asset_symbol, quantity, prices):
+        """
+        Appends transactions of one asset and quantity to the log, column by column.
+        Timestamps are stored as pd.Timestamp, so later readers need no parsing.
 
-        self.transactions.append(new_transaction)
+        Args:
+            timestamps, types, prices: Sequences with one entry per transaction.
+        """
+        n = len(timestamps)
+        tx = self._tx
+        tx['timestamp'].extend(map(pd.Timestamp, timestamps))
+        tx['type'].extend(types)
+        tx['asset'].extend([asset_symbol] * n)
+        tx['quantity'].extend([quantity] * n)
+        tx['price'].extend(prices)
 
     def get_current_holdings(self):
         """
-        Returns the current positions held by the portfolio.
+        Returns the current positions held by the portfolio, as a dict
+        (a snapshot, see positions).
         """
         return self.positions
 
@@ -154,4 +423,4 @@ class Portfolio:
         """
         Returns the final transaction and equity data for analysis.
         """
-        return pd.DataFrame(self.transactions), self.equity_curve
+        return pd.DataFrame(self._tx), self.equity_curve
@@ -1,6 +1,8 @@
+import numpy as np
 import pandas as pd
 from strategy import Strategy
 
+
 class SMACrossoverStrategy(Strategy):
     """
     A strategy that generates signals based on a Simple Moving Average (SMA) crossover.
@@ -9,6 +11,8 @@ class SMACrossoverStrategy(Strategy):
         super().__init__(asset_symbol)
         self.short_window = short_window
         self.long_window = long_window
+        # Current and previous long SMA
+        self.required_lookback = long_window + 1
 
     def generate_signals(self, data):
         """
@@ -16,26 +20,22 @@ class SMACrossoverStrategy(Strategy):
         
         A 'BUY' signal is generated when the short SMA crosses above the long SMA.
         A 'SELL' signal is generated when the short SMA crosses below the long SMA.
+
+        Each call computes the SMAs over the whole of data, O(N) per call. No
+        state is kept between calls: an O(1) running-sum update only gives the
+        same signals as rolling().mean() by copying its internal
+        compensated-sum arithmetic. Drivers that walk a known series bar by
+        bar use generate_signals_vectorized, or precompute and signal_at.
         """
-        if len(data) < self.long_window:
+        close = data['Close']
+        if len(close) < self.long_window:
             return 'HOLD'
 
-        # Calculate the short and long SMAs
-        short_sma = data['Close'].rolling(window=self.short_window).mean()
-        #print(short_sma)
-        long_sma = data['Close'].rolling(window=self.long_window).mean()
-        #print(short_sma)
-        # Get the latest SMA values
-        latest_short_sma = short_sma.iloc[-1]
-        #print("iloc:", short_sma.iloc[-1])
-        #print(f"latest_short_sma = {latest_short_sma}")
-        latest_long_sma = long_sma.iloc[-1]
-        #print(f"latest_long_sma = {latest_long_sma}")
-
-        previous_short_sma = short_sma.iloc[-2]
-        #print(f"previous_short_sma = {previous_short_sma}")
-        previous_long_sma = long_sma.iloc[-2]
-        #print(f"previous_long_sma = {previous_long_sma}")
+        # Latest and previous SMA values (plain buffer reads on the NumPy views)
+        short_arr = close.rolling(window=self.short_window).mean().to_numpy()
+        long_arr = close.rolling(window=self.long_window).mean().to_numpy()
+        latest_short_sma, previous_short_sma = short_arr[-1], short_arr[-2]
+        latest_long_sma, previous_long_sma = long_arr[-1], long_arr[-2]
 
         # Check for a crossover
         if previous_short_sma <= previous_long_sma and latest_short_sma > latest_long_sma:
@@ -43,4 +43,67 @@ class SMACrossoverStrategy(Strategy):
         elif previous_short_sma >= previous_long_sma and latest_short_sma < latest_long_sma:
             return 'SHORT'
         else:
-            return 'HOLD'
\ No newline at end of file
+            return 'HOLD'
+
+    def precompute(self, data):
+        """
+        Computes both SMAs once over the full data, for drivers that then ask
+        signal_at(i) bar by bar instead of calling generate_signals on prefixes.
+        """
+        close = data['Close']
+        # pandas rolling, not bottleneck.move_mean: its uncompensated running
+        # sum breaks exact ties between the SMAs and changes the signals
+        self._short = close.rolling(window=self.short_window).mean().to_numpy()
+        self._long = close.rolling(window=self.long_window).mean().to_numpy()
+
+    def signal_at(self, i):
+        """
+        Signal of bar i (integer position) from the SMAs stored by precompute.
+        """
+        if i < 1 or i < self.long_window - 1:
+            return 'HOLD'
+        previous_short_sma, latest_short_sma = self._short[i - 1], self._short[i]
+        previous_long_sma, latest_long_sma = self._long[i - 1], self._long[i]
+        if previous_short_sma <= previous_long_sma and latest_short_sma > latest_long_sma:
+            return 'LONG'
+        elif previous_short_sma >= previous_long_sma and latest_short_sma < latest_long_sma:
+            return 'SHORT'
+        else:
+            return 'HOLD'
+
+    def generate_signal_scalar(self, window):
+        """
+        Same crossover as generate_signals, from a NumPy window of the last closes.
+        """
+        if len(window) < self.required_lookback:
+            return 'HOLD'
+
+        latest_short_sma = window[-self.short_window:].mean()
+        latest_long_sma = window[-self.long_window:].mean()
+        previous_short_sma = window[-self.short_window - 1:-1].mean()
+        previous_long_sma = window[-self.long_window - 1:-1].mean()
+
+        if previous_short_sma <= previous_long_sma and latest_short_sma > latest_long_sma:
+            return 'LONG'
+        elif previous_short_sma >= previous_long_sma and latest_short_sma < latest_long_sma:
+            return 'SHORT'
+        else:
+            return 'HOLD'
+
+    def generate_signals_vectorized(self, data):
+        """
+        Generates the signal of every bar at once; matches generate_signals on each prefix.
+        """
+        close = data['Close']
+        short_sma = close.rolling(window=self.short_window).mean()
+        long_sma = close.rolling(window=self.long_window).mean()
+        previous_short_sma = short_sma.shift(1)
+        previous_long_sma = long_sma.shift(1)
+
+        long_cross = (previous_short_sma <= previous_long_sma) & (short_sma > long_sma)
+        short_cross = (previous_short_sma >= previous_long_sma) & (short_sma < long_sma)
+
+        signals = np.select([long_cross, short_cross], ['LONG', 'SHORT'], default='HOLD').astype(object)
+        # Not enough bars yet for the long window
+        signals[:self.long_window - 1] = 'HOLD'
+        return pd.Series(signals, index=data.index)
@@ -1,4 +1,8 @@
+import pandas as pd
+
 class Strategy:
+    # Bars needed by generate_signal_scalar; None if the strategy does not implement it
+    required_lookback = None
 
     def __init__(self, asset_symbol='str'):
         self.asset_symbol = asset_symbol
@@ -11,4 +15,27 @@ class Strategy:
     def generate_signals(self, data) -> str:
         #this method must be overriden by the subclass
         raise NotImplementedError("The generate_signals() method must be implemented by a subclass.")
-   
\ No newline at end of file
+
+    def generate_signal_scalar(self, window) -> str:
+        """
+        Returns the signal of the last bar given a NumPy array with the last
+        required_lookback closes (fewer at the start of the data).
+        """
+        raise NotImplementedError("The generate_signal_scalar() method must be implemented by a subclass that sets required_lookback.")
+
+    def generate_signals_vectorized(self, data) -> pd.Series:
+        """
+        Returns the signal of every bar in a single pass over the full dataset.
+
+        The signal at bar i must equal generate_signals(data.iloc[:i+1]).
+        This fallback calls generate_signal_scalar on zero-copy close windows
+        when the strategy declares required_lookback, or generate_signals on
+        each prefix otherwise. Subclasses should override it with a vectorized version.
+        """
+        lookback = self.required_lookback
+        if lookback is not None:
+            close_arr = data['Close'].to_numpy(dtype='float64')
+            signals = [self.generate_signal_scalar(close_arr[max(0, i - lookback + 1):i + 1]) for i in range(len(close_arr))]
+        else:
+            signals = [self.generate_signals(data.iloc[:i+1]) for i in range(len(data))]
+        return pd.Series(signals, index=data.index, dtype=object)
@@ -10,13 +10,4 @@ class Trade:
     stop_loss: float = 0.04
     take_profit: float = 0.08
     is_open: bool = False
-
-    def cost_trade(self): #AREA IMPROVEMENT -> ADD COMISSION MARKET MAKER
-        return self.quantity * self.entry_price
-    
-    def close_trade(self):
-        self.is_open = False
-    
-    def open_trade(self):
-        self.is_open = True
-    
+    asset_id: int = -1  # Portfolio.register_asset id, set when the trade is opened
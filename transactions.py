@@ -1,9 +1,9 @@
-from dataclasses import dataclass
+from typing import NamedTuple
+import pandas as pd
 
-@dataclass
-class Transaction:
-    timestamp: str
+class Transaction(NamedTuple):
+    timestamp: pd.Timestamp
     type: str
     asset: str
     quantity: float
-    price: float
\ No newline at end of file
+    price: float